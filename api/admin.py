@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from .models import Event, Organization, User, EventOrganizers, MembersInOrganization, Notification, EventCategory, \
-    Slide, EventType, EventGuests, School, Faculty
+    Slide, EventType, EventGuests, School, Faculty, OutgoingEmail
 
 
 class OrganizersInline(admin.TabularInline):
@@ -9,13 +9,18 @@ class OrganizersInline(admin.TabularInline):
     extra = 1
 
 
+class GuestsInline(admin.TabularInline):
+    model = EventGuests
+    extra = 1
+
+
 class MembersInline(admin.TabularInline):
     model = MembersInOrganization
     extra = 1
 
 
 class EventAdmin(admin.ModelAdmin):
-    inlines = (OrganizersInline,)
+    inlines = (OrganizersInline, GuestsInline)
 
 
 class OrganizationAdmin(admin.ModelAdmin):
@@ -55,6 +60,12 @@ class NotificationAdmin(admin.ModelAdmin):
     list_display = ('user', 'message')
 
 
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+
+
 # Custom User admin with no username field
 @admin.register(User)
 class UserAdmin(DjangoUserAdmin):
@@ -0,0 +1,114 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from api.caching import get_version, shared_timeout
+from api.models import User, TOKEN_USER_FIELDS, USERS_TOKEN_VERSION_KEY
+
+# Утверждение токена с версией полей пользователя
+AUTH_VERSION_CLAIM = 'auth_version'
+
+
+def auth_version(values):
+    """
+    Версия полей пользователя из токена (меняется при изменении email, прав или активности)
+    """
+    return hashlib.md5(repr(tuple(values)).encode()).hexdigest()[:16]
+
+
+def user_auth_version(user):
+    """
+    Версия полей пользователя для объекта пользователя
+    """
+    return auth_version(getattr(user, field) for field in TOKEN_USER_FIELDS)
+
+
+def _auth_version_key(user_id):
+    # Версия всех пользователей в ключе: после массового изменения пользователей
+    # (QuerySet.update) сохраненные версии больше не читаются
+    return f'auth:version:{get_version(USERS_TOKEN_VERSION_KEY)}:{user_id}'
+
+
+def _auth_version_timeout():
+    # Версия сбрасывается в процессе, где сохранен пользователь, поэтому в кеше
+    # в памяти процесса она хранится не дольше LOCAL_CACHE_TIMEOUT
+    return shared_timeout(getattr(settings, 'AUTH_VERSION_CACHE_TIMEOUT', 60 * 60 * 24))
+
+
+def get_auth_version(user_id):
+    """
+    Текущая версия полей пользователя из кеша, при промахе загружается из базы данных
+    """
+    key = _auth_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        values = User.objects.filter(pk=user_id).values_list(*TOKEN_USER_FIELDS).first()
+        if values is None:
+            return None
+        version = auth_version(values)
+        cache.set(key, version, _auth_version_timeout())
+    return version
+
+
+def set_auth_version(user):
+    """
+    Обновление версии полей пользователя в кеше
+    """
+    cache.set(_auth_version_key(user.pk), user_auth_version(user), _auth_version_timeout())
+
+
+def delete_auth_version(user_id):
+    """
+    Удаление версии полей пользователя из кеша
+    """
+    cache.delete(_auth_version_key(user_id))
+
+
+def add_user_claims(token, user):
+    """
+    Добавление полей пользователя и их версии в токен
+    """
+    for field in TOKEN_USER_FIELDS:
+        token[field] = getattr(user, field)
+    token[AUTH_VERSION_CLAIM] = user_auth_version(user)
+    return token
+
+
+def token_user(validated_token):
+    """
+    Пользователь из утверждений токена или None, если утверждения устарели
+
+    Остальные поля пользователя отложены и загружаются из базы данных при первом обращении
+    """
+    user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+    if any(field not in validated_token for field in TOKEN_USER_FIELDS + (AUTH_VERSION_CLAIM,)):
+        return None
+    values = {field: validated_token[field] for field in TOKEN_USER_FIELDS}
+    version = auth_version(values[field] for field in TOKEN_USER_FIELDS)
+    if version != validated_token[AUTH_VERSION_CLAIM] or version != get_auth_version(user_id):
+        return None
+    values['id'] = user_id
+    field_names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db('default', field_names, [values[name] for name in field_names])
+
+
+class TokenClaimsAuthentication(JWTAuthentication):
+    """
+    JWT аутентификация без запроса пользователя к базе данных
+
+    Пользователь восстанавливается из утверждений токена, если их версия совпадает
+    с текущей версией в кеше; иначе (старый токен, изменены права) пользователь загружается из базы данных
+    """
+    def get_user(self, validated_token):
+        if jwt_settings.USER_ID_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        user = token_user(validated_token)
+        if user is None:
+            return super().get_user(validated_token)
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return user
@@ -0,0 +1,219 @@
+from collections import defaultdict, namedtuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from api.counters import recount
+from api.models import Event, EventOrganizers, User
+from api.roles import get_user_roles, invalidate_user_roles
+from api.signals import row_signals_suppressed
+
+# Размер пачки INSERT при массовом добавлении строк
+BULK_BATCH_SIZE = 500
+
+
+# Строка массовой операции: проверенные данные или ошибки сериализатора
+BulkRow = namedtuple('BulkRow', ('data', 'errors'))
+
+
+class BulkStatus:
+    """
+    Результаты обработки строки массовой операции
+    """
+    CREATED = 'created'
+    DELETED = 'deleted'
+    EXISTS = 'exists'
+    MISSING = 'missing'
+    DUPLICATE = 'duplicate'
+    INVALID = 'invalid'
+    NOT_FOUND = 'not_found'
+    FORBIDDEN = 'forbidden'
+
+
+def bulk_max_rows():
+    """
+    Максимальное количество строк в одном запросе массовой операции
+    """
+    return getattr(settings, 'BULK_MAX_ROWS', 5000)
+
+
+def validate_rows(serializer_class, rows, context=None):
+    """
+    Проверка каждой строки сериализатором строки
+    """
+    result = []
+    for row in rows:
+        serializer = serializer_class(data=row, context=context)
+        if serializer.is_valid():
+            result.append(BulkRow(dict(serializer.validated_data), None))
+        else:
+            result.append(BulkRow(None, serializer.errors))
+    return result
+
+
+def managed_event_ids(request, event_organizations):
+    """
+    id мероприятий, строками которых может управлять пользователь
+
+    Права проверяются один раз для каждой пары (пользователь, мероприятие)
+    """
+    if request.user.is_staff:
+        return set(event_organizations)
+    roles = get_user_roles(request)
+    leader_events = set(roles.leader_event_ids())
+    leader_organizations = set(roles.leader_organization_ids())
+    return {event_id for event_id, organization_id in event_organizations.items()
+            if event_id in leader_events or organization_id in leader_organizations}
+
+
+def _check_rows(request, rows, allow_self):
+    """
+    Проверка существования и прав для проверенных строк
+
+    Возвращает отчет и список (индекс, строка) строк, прошедших проверку
+    """
+    report = [None] * len(rows)
+    user_id = request.user.id
+    for index, row in enumerate(rows):
+        if row.errors is None:
+            row.data.setdefault('user', user_id)
+
+    checked = [(index, row.data) for index, row in enumerate(rows) if row.errors is None]
+    event_organizations = dict(Event.objects
+                               .filter(id__in={data['event'] for index, data in checked})
+                               .values_list('id', 'organization_id'))
+    user_ids = set(User.objects
+                   .filter(id__in={data['user'] for index, data in checked})
+                   .values_list('id', flat=True))
+    managed = managed_event_ids(request, event_organizations)
+
+    accepted = []
+    seen = set()
+    for index, row in enumerate(rows):
+        if row.errors is not None:
+            report[index] = {'index': index, 'status': BulkStatus.INVALID, 'errors': row.errors}
+            continue
+        data = row.data
+        pair = (data['user'], data['event'])
+        result = {'index': index, 'event': data['event'], 'user': data['user']}
+        report[index] = result
+        if data['event'] not in event_organizations or data['user'] not in user_ids:
+            result['status'] = BulkStatus.NOT_FOUND
+        elif data['event'] not in managed and not (allow_self and data['user'] == user_id):
+            result['status'] = BulkStatus.FORBIDDEN
+        elif pair in seen:
+            result['status'] = BulkStatus.DUPLICATE
+        else:
+            seen.add(pair)
+            accepted.append((index, data))
+    return report, accepted
+
+
+def _existing_pairs(model, accepted):
+    """
+    Уже существующие пары (пользователь, мероприятие) среди строк
+    """
+    events_users = defaultdict(set)
+    for index, data in accepted:
+        events_users[data['event']].add(data['user'])
+    pairs = set()
+    for event_id, user_ids in events_users.items():
+        pairs.update(model.objects
+                     .filter(event_id=event_id, user_id__in=user_ids)
+                     .values_list('user_id', 'event_id'))
+    return pairs
+
+
+def _after_bulk_change(model, event_ids, user_ids):
+    """
+    Действия, которые обычно выполняют сигналы: счетчики, updated_at и кеш ролей
+    """
+    recount(model, event_ids)
+    if model is EventOrganizers:
+        for user_id in user_ids:
+            invalidate_user_roles(user_id)
+
+
+def _insert_rows(model, pending, report):
+    """
+    Добавление строк (индекс, данные) в текущей транзакции
+
+    Если пару (пользователь, мероприятие) параллельно добавил другой запрос после проверки,
+    вставка пачки откатывается, пары читаются заново и такие строки отмечаются как существующие.
+    Возвращает данные добавленных строк
+    """
+    while pending:
+        objects = [model(event_id=data['event'], user_id=data['user'],
+                         **{name: value for name, value in data.items() if name not in ('event', 'user')})
+                   for index, data in pending]
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(objects, batch_size=BULK_BATCH_SIZE)
+        except IntegrityError:
+            existing = _existing_pairs(model, pending)
+            if not existing:
+                raise
+            for index, data in pending:
+                if (data['user'], data['event']) in existing:
+                    report[index]['status'] = BulkStatus.EXISTS
+            pending = [(index, data) for index, data in pending
+                       if (data['user'], data['event']) not in existing]
+        else:
+            break
+    return [data for index, data in pending]
+
+
+def bulk_create_rows(request, model, rows, allow_self=False):
+    """
+    Массовое добавление гостей или организаторов мероприятий
+
+    rows - результаты validate_rows, строки без user добавляются
+    для текущего пользователя; allow_self разрешает добавлять себя без прав руководителя.
+    Возвращает отчет по каждой строке
+    """
+    report, accepted = _check_rows(request, rows, allow_self)
+    existing = _existing_pairs(model, accepted)
+    pending = []
+    for index, data in accepted:
+        if (data['user'], data['event']) in existing:
+            report[index]['status'] = BulkStatus.EXISTS
+        else:
+            report[index]['status'] = BulkStatus.CREATED
+            pending.append((index, data))
+
+    if pending:
+        with transaction.atomic():
+            created = _insert_rows(model, pending, report)
+            if created:
+                _after_bulk_change(model, {data['event'] for data in created},
+                                   {data['user'] for data in created})
+    return report
+
+
+def bulk_delete_rows(request, model, rows, allow_self=False):
+    """
+    Массовое удаление гостей или организаторов мероприятий
+
+    У моделей есть обработчики post_delete, поэтому Django не удаляет строки одним DELETE,
+    а сначала загружает их: в память попадают только удаляемые строки запроса
+    (не больше BULK_MAX_ROWS), а не все строки мероприятий.
+    Возвращает отчет по каждой строке
+    """
+    report, accepted = _check_rows(request, rows, allow_self)
+    existing = _existing_pairs(model, accepted)
+    events_users = defaultdict(set)
+    for index, data in accepted:
+        if (data['user'], data['event']) in existing:
+            report[index]['status'] = BulkStatus.DELETED
+            events_users[data['event']].add(data['user'])
+        else:
+            report[index]['status'] = BulkStatus.MISSING
+
+    if events_users:
+        # Счетчики и роли пересчитываются один раз в _after_bulk_change, а не для каждой строки
+        with transaction.atomic(), row_signals_suppressed():
+            for event_id, user_ids in events_users.items():
+                model.objects.filter(event_id=event_id, user_id__in=user_ids).delete()
+            _after_bulk_change(model, set(events_users),
+                               {user_id for user_ids in events_users.values() for user_id in user_ids})
+    return report
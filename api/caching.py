@@ -0,0 +1,79 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def _initial_version():
+    """
+    Начальная версия от времени, чтобы после вытеснения ключа не повторять старые версии
+    """
+    return int(time.time() * 1000)
+
+
+def is_process_local(cache_alias='default'):
+    """
+    Хранится ли кеш в памяти процесса (его изменения не видны другим процессам сервера)
+    """
+    return isinstance(caches[cache_alias], LocMemCache)
+
+
+def shared_timeout(timeout, cache_alias='default', local_timeout=None):
+    """
+    Время хранения значения, которое сбрасывается при изменениях в других процессах
+
+    Для кеша в памяти процесса ограничивается local_timeout (по умолчанию LOCAL_CACHE_TIMEOUT),
+    иначе изменения из других процессов не были бы видны до истечения timeout
+    """
+    if not is_process_local(cache_alias):
+        return timeout
+    if local_timeout is None:
+        local_timeout = getattr(settings, 'LOCAL_CACHE_TIMEOUT', 5)
+    return local_timeout if timeout is None else min(timeout, local_timeout)
+
+
+def get_version(key, cache_alias='default', local_timeout=None):
+    """
+    Текущая версия по ключу кеша
+    """
+    cache = caches[cache_alias]
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), shared_timeout(None, cache_alias, local_timeout))
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key, cache_alias='default', local_timeout=None):
+    """
+    Увеличение версии по ключу кеша
+    """
+    cache = caches[cache_alias]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, _initial_version(), shared_timeout(None, cache_alias, local_timeout))
+
+
+def _table_version_key(model):
+    return f'table-version:{model._meta.db_table}'
+
+
+def _table_version_local_timeout():
+    # В памяти процесса версия живет не дольше max-age ответа, который по ней кешируется
+    return getattr(settings, 'REFERENCE_CACHE_MAX_AGE', 60)
+
+
+def get_table_version(model):
+    """
+    Версия данных таблицы модели, увеличивается при сохранении и удалении
+    """
+    return get_version(_table_version_key(model), local_timeout=_table_version_local_timeout())
+
+
+def bump_table_version(model):
+    """
+    Увеличение версии данных таблицы модели
+    """
+    bump_version(_table_version_key(model), local_timeout=_table_version_local_timeout())
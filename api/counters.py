@@ -0,0 +1,67 @@
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from api.models import EventGuests, EventOrganizers, MembersInOrganization
+
+# Счетчики строк: модель строки -> (поле родительского объекта, поле счетчика)
+COUNTERS = {
+    EventGuests: ('event', 'guests_count'),
+    EventOrganizers: ('event', 'organizers_count'),
+    MembersInOrganization: ('organization', 'members_count'),
+}
+
+
+def change_counter(model, parent_id, delta):
+    """
+    Атомарное изменение счетчика родительского объекта и его updated_at
+    """
+    parent_field, count_field = COUNTERS[model]
+    parent_model = model._meta.get_field(parent_field).related_model
+    values = {'updated_at': timezone.now()}
+    if delta:
+        values[count_field] = F(count_field) + delta
+    parent_model.objects.filter(pk=parent_id).update(**values)
+
+
+def recount(model, parent_ids):
+    """
+    Пересчет счетчика указанных родительских объектов по строкам в базе данных
+    """
+    parent_field, count_field = COUNTERS[model]
+    parent_model = model._meta.get_field(parent_field).related_model
+    parent_model.objects.filter(pk__in=parent_ids).update(
+        **{count_field: actual_count(model), 'updated_at': timezone.now()})
+
+
+def actual_count(model):
+    """
+    Выражение фактического количества строк для родительского объекта
+    """
+    parent_field, count_field = COUNTERS[model]
+    rows = (model.objects
+            .filter(**{parent_field: OuterRef('pk')})
+            .order_by()
+            .values(parent_field)
+            .annotate(count=Count('pk'))
+            .values('count'))
+    return Coalesce(Subquery(rows), Value(0))
+
+
+def repair_counters():
+    """
+    Пересчет расходящихся счетчиков по строкам в базе данных
+
+    Возвращает количество исправленных объектов по полям счетчиков
+    """
+    repaired = {}
+    for model, (parent_field, count_field) in COUNTERS.items():
+        parent_model = model._meta.get_field(parent_field).related_model
+        broken_ids = list(parent_model.objects
+                          .annotate(actual_count=actual_count(model))
+                          .exclude(**{count_field: F('actual_count')})
+                          .values_list('pk', flat=True))
+        if broken_ids:
+            recount(model, broken_ids)
+        repaired[f'{parent_model._meta.model_name}.{count_field}'] = len(broken_ids)
+    return repaired
@@ -0,0 +1,216 @@
+import csv
+import json
+from collections import Counter
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from api.counters import recount
+from api.models import School, Faculty, User, Organization, MembersInOrganization
+from api.roles import invalidate_user_roles
+
+# Количество строк, импортируемых в одной транзакции
+IMPORT_BATCH_SIZE = 1000
+
+# Поля профиля пользователя, которые переносятся из файла
+USER_FIELDS = ('name', 'surname', 'fathers_name', 'education_level', 'education_year', 'phone')
+
+# Максимальное количество сохраняемых сообщений об ошибках
+MAX_REPORTED_ERRORS = 100
+
+
+def read_rows(file, file_format):
+    """
+    Потоковое чтение строк CSV (с заголовком) или JSONL
+
+    Возвращает пары (номер строки, словарь) или (номер строки, None) для нечитаемых строк
+    """
+    if file_format == 'csv':
+        for number, row in enumerate(csv.DictReader(file), start=2):
+            yield number, row
+        return
+    for number, line in enumerate(file, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield number, row if isinstance(row, dict) else None
+
+
+def _text(row, name):
+    value = row.get(name)
+    return '' if value is None else str(value).strip()
+
+
+class DirectoryImporter:
+    """
+    Импорт школ, факультетов, пользователей и членства в организациях пачками
+
+    Строки сопоставляются с существующими записями: школы по названию, факультеты
+    по школе и названию, пользователи по email, членство по пользователю и организации
+    """
+    def __init__(self, hash_pool, batch_size=IMPORT_BATCH_SIZE):
+        self.hash_pool = hash_pool
+        self.batch_size = batch_size
+        self.stats = Counter()
+        self.errors = []
+        self._schools = {}
+        self._faculties = {}
+
+    def _error(self, number, message):
+        self.stats['errors'] += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f'строка {number}: {message}')
+
+    def _school_id(self, name):
+        if name not in self._schools:
+            school = School.objects.filter(name=name).order_by('id').first()
+            if school is None:
+                school = School.objects.create(name=name)
+                self.stats['schools_created'] += 1
+            self._schools[name] = school.id
+        return self._schools[name]
+
+    def _faculty_id(self, school_id, name):
+        key = (school_id, name)
+        if key not in self._faculties:
+            faculty = Faculty.objects.filter(school_id=school_id, name=name).order_by('id').first()
+            if faculty is None:
+                faculty = Faculty.objects.create(school_id=school_id, name=name)
+                self.stats['faculties_created'] += 1
+            self._faculties[key] = faculty.id
+        return self._faculties[key]
+
+    def _clean(self, row):
+        """
+        Проверка строки, возвращает данные пользователя и членства
+        """
+        email = User.objects.normalize_email(_text(row, 'email'))
+        if not email or '@' not in email:
+            raise ValueError('не указан email')
+        data = {'email': email, 'password': _text(row, 'password') or None}
+        for field in USER_FIELDS:
+            value = _text(row, field)
+            if value:
+                data[field] = value
+        if 'education_level' in data and data['education_level'] not in User.EducationChoices.values:
+            raise ValueError(f'неизвестный уровень образования {data["education_level"]}')
+
+        school = _text(row, 'school')
+        faculty = _text(row, 'faculty')
+        if faculty and not school:
+            raise ValueError('факультет указан без школы')
+        if school:
+            data['school_id'] = self._school_id(school)
+        if faculty:
+            data['faculty_id'] = self._faculty_id(data['school_id'], faculty)
+
+        organization = _text(row, 'organization')
+        if organization:
+            if not organization.isdigit():
+                raise ValueError('id организации должен быть числом')
+            role = _text(row, 'role') or MembersInOrganization.RoleChoices.MEMBER
+            if role not in MembersInOrganization.RoleChoices.values:
+                raise ValueError(f'неизвестная роль {role}')
+            data['membership'] = (int(organization), role)
+        return data
+
+    def import_rows(self, rows):
+        """
+        Импорт всех строк, после каждой пачки возвращает количество обработанных строк
+        """
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            self.import_batch(batch)
+            self.stats['rows'] += len(batch)
+            yield self.stats['rows']
+
+    def import_batch(self, batch):
+        """
+        Импорт пачки строк в одной транзакции
+        """
+        cleaned = {}
+        for number, row in batch:
+            if row is None:
+                self._error(number, 'не удалось прочитать строку')
+                continue
+            try:
+                data = self._clean(row)
+            except ValueError as exc:
+                self._error(number, exc)
+                continue
+            # Повтор email в пачке: используется последняя строка
+            cleaned[data['email']] = (number, data)
+
+        memberships = {data['membership'][0] for number, data in cleaned.values() if 'membership' in data}
+        organization_ids = set(Organization.objects.filter(id__in=memberships).values_list('id', flat=True))
+        for email, (number, data) in list(cleaned.items()):
+            if 'membership' in data and data['membership'][0] not in organization_ids:
+                self._error(number, f'организация {data["membership"][0]} не найдена')
+                del cleaned[email]
+
+        existing = {user.email: user for user in User.objects.filter(email__in=cleaned)}
+        new_rows = [data for email, (number, data) in cleaned.items() if email not in existing]
+
+        with transaction.atomic():
+            User.objects.bulk_create_users(
+                [User(**{name: value for name, value in data.items() if name not in ('password', 'membership')})
+                 for data in new_rows],
+                [data['password'] for data in new_rows],
+                self.hash_pool, self.batch_size)
+            self.stats['users_created'] += len(new_rows)
+
+            updated = []
+            now = timezone.now()
+            for email, user in existing.items():
+                number, data = cleaned[email]
+                fields = [name for name in data if name not in ('email', 'password', 'membership')]
+                if any(getattr(user, name) != data[name] for name in fields):
+                    for name in fields:
+                        setattr(user, name, data[name])
+                    user.updated_at = now
+                    updated.append(user)
+            update_fields = list(USER_FIELDS) + ['school_id', 'faculty_id', 'updated_at']
+            User.objects.bulk_update(updated, update_fields, batch_size=self.batch_size)
+            self.stats['users_updated'] += len(updated)
+
+            self._import_memberships(cleaned)
+
+    def _import_memberships(self, cleaned):
+        """
+        Создание членства и обновление ролей без сигналов, счетчики и кеш ролей обновляются после
+        """
+        user_ids = dict(User.objects.filter(email__in=cleaned).values_list('email', 'id'))
+        wanted = {(user_ids[email], data['membership'][0]): data['membership'][1]
+                  for email, (number, data) in cleaned.items() if 'membership' in data}
+        if not wanted:
+            return
+        existing = {(member.user_id, member.organization_id): member for member in MembersInOrganization.objects
+                    .filter(user_id__in={user_id for user_id, organization_id in wanted},
+                            organization_id__in={organization_id for user_id, organization_id in wanted})}
+        created = [MembersInOrganization(user_id=user_id, organization_id=organization_id, role=role)
+                   for (user_id, organization_id), role in wanted.items() if (user_id, organization_id) not in existing]
+        changed = []
+        for key, role in wanted.items():
+            member = existing.get(key)
+            if member is not None and member.role != role:
+                member.role = role
+                member.updated_at = timezone.now()
+                changed.append(member)
+        MembersInOrganization.objects.bulk_create(created, batch_size=self.batch_size, ignore_conflicts=True)
+        MembersInOrganization.objects.bulk_update(changed, ['role', 'updated_at'], batch_size=self.batch_size)
+        self.stats['memberships_created'] += len(created)
+        self.stats['memberships_updated'] += len(changed)
+
+        affected = created + changed
+        if affected:
+            recount(MembersInOrganization, {member.organization_id for member in affected})
+            for user_id in {member.user_id for member in affected}:
+                invalidate_user_roles(user_id)
@@ -0,0 +1,96 @@
+import csv
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+
+from api.models import EventGuests, MembersInOrganization
+
+# Количество строк, читаемых из курсора базы данных за один раз
+EXPORT_CHUNK_SIZE = 2000
+
+# Колонки выгрузки пользователя: поле -> заголовок
+USER_COLUMNS = (
+    ('user__email', 'Email'),
+    ('user__surname', 'Фамилия'),
+    ('user__name', 'Имя'),
+    ('user__fathers_name', 'Отчество'),
+    ('user__school__name', 'Школа'),
+    ('user__faculty__name', 'Факультет'),
+    ('user__education_level', 'Уровень образования'),
+    ('user__education_year', 'Год обучения'),
+)
+
+# Колонки выгрузки гостей мероприятия
+GUEST_COLUMNS = USER_COLUMNS + (
+    ('created_at', 'Дата регистрации'),
+)
+
+# Колонки выгрузки членов организации
+MEMBER_COLUMNS = USER_COLUMNS + (
+    ('role', 'Роль'),
+    ('organization_confirm', 'Подтверждение организации'),
+    ('user_confirm', 'Подтверждение пользователя'),
+    ('created_at', 'Дата вступления'),
+)
+
+# Символы, с которых табличные редакторы начинают формулу
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class _Echo:
+    """
+    Файлоподобный объект для csv.writer, возвращающий записанную строку
+    """
+    def write(self, value):
+        return value
+
+
+def _safe_cell(value):
+    """
+    Значение ячейки без выполнения формул при открытии в табличном редакторе
+    """
+    if value is None:
+        return ''
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv(queryset, columns, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Строки CSV из набора данных, читаемого серверным курсором пачками по chunk_size
+    """
+    writer = csv.writer(_Echo())
+    # BOM, чтобы Excel распознал UTF-8
+    yield '\ufeff' + writer.writerow([title for field, title in columns])
+    rows = queryset.order_by('id').values_list(*[field for field, title in columns]).iterator(chunk_size=chunk_size)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        yield ''.join(writer.writerow([_safe_cell(value) for value in row]) for row in chunk)
+
+
+def csv_response(queryset, columns, filename):
+    """
+    Потоковый ответ с выгрузкой CSV
+    """
+    response = StreamingHttpResponse(iter_csv(queryset, columns), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def export_event_guests(event_id):
+    """
+    Выгрузка гостей мероприятия в CSV
+    """
+    return csv_response(EventGuests.objects.filter(event_id=event_id), GUEST_COLUMNS,
+                        f'event-{event_id}-guests.csv')
+
+
+def export_organization_members(organization_id):
+    """
+    Выгрузка членов организации в CSV
+    """
+    return csv_response(MembersInOrganization.objects.filter(organization_id=organization_id), MEMBER_COLUMNS,
+                        f'organization-{organization_id}-members.csv')
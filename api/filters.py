@@ -0,0 +1,89 @@
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from api.models import Event
+
+
+def _date_param(request, name):
+    """
+    Получение даты из параметров запроса
+    """
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        date = parse_date(value)
+    except ValueError:
+        date = None
+    if date is None:
+        raise ValidationError({name: f'Неверная дата: {value}, ожидается YYYY-MM-DD'})
+    return date
+
+
+def _list_param(request, name, choices=None, cast=str):
+    """
+    Получение списка значений через запятую из параметров запроса
+    """
+    value = request.query_params.get(name)
+    if not value:
+        return None
+    try:
+        values = [cast(item) for item in value.split(',') if item]
+    except ValueError:
+        raise ValidationError({name: f'Неверное значение: {value}'})
+    if choices is not None:
+        invalid = [item for item in values if item not in choices]
+        if invalid:
+            raise ValidationError({name: f'Неверное значение: {",".join(invalid)}'})
+    return values
+
+
+class EventFilterBackend(BaseFilterBackend):
+    """
+    Фильтрация мероприятий
+
+    date_after, date_before, date_end_after, date_end_before - диапазоны дат (YYYY-MM-DD),
+    status, level, organization, event_category, event_type - списки значений через запятую
+    """
+    def filter_queryset(self, request, queryset, view):
+        """
+        Фильтрация набора данных
+        """
+        date_filters = {
+            'date_after': 'date__gte',
+            'date_before': 'date__lte',
+            'date_end_after': 'date_end__gte',
+            'date_end_before': 'date_end__lte',
+        }
+        for param, lookup in date_filters.items():
+            date = _date_param(request, param)
+            if date is not None:
+                queryset = queryset.filter(**{lookup: date})
+
+        statuses = _list_param(request, 'status', choices=Event.StatusChoices.values)
+        if statuses is not None:
+            queryset = queryset.filter(status__in=statuses)
+
+        levels = _list_param(request, 'level', choices=Event.LevelChoices.values)
+        if levels is not None:
+            queryset = queryset.filter(level__in=levels)
+
+        organizations = _list_param(request, 'organization', cast=int)
+        if organizations is not None:
+            queryset = queryset.filter(organization_id__in=organizations)
+
+        # Фильтрация по M2M через подзапрос, чтобы не дублировать строки мероприятий
+        categories = _list_param(request, 'event_category', cast=int)
+        if categories is not None:
+            queryset = queryset.filter(id__in=Event.event_category.through.objects
+                                       .filter(eventcategory_id__in=categories)
+                                       .values('event_id'))
+
+        types = _list_param(request, 'event_type', cast=int)
+        if types is not None:
+            queryset = queryset.filter(id__in=Event.event_type.through.objects
+                                       .filter(eventtype_id__in=types)
+                                       .values('event_id'))
+
+        return queryset
@@ -0,0 +1,167 @@
+import os
+from io import BytesIO
+
+from PIL import Image
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.db.models import F, Q
+from django.db.models.fields.json import KeyTextTransform
+
+# Ширины производных изображений в пикселях
+DERIVATIVE_WIDTHS = (160, 480, 960)
+
+# Форматы производных изображений (используются только поддерживаемые Pillow)
+DERIVATIVE_FORMATS = ('webp', 'avif')
+
+# Качество сжатия производных изображений
+DERIVATIVE_QUALITY = 80
+
+# Поля изображений моделей, для которых создаются производные изображения
+IMAGE_FIELDS = {
+    'api.User': 'image',
+    'api.Organization': 'image',
+    'api.Event': 'image',
+    'api.Slide': 'img',
+}
+
+
+def derivatives_field_name(field_name):
+    """
+    Имя поля модели со списком созданных производных изображений
+    """
+    return f'{field_name}_derivatives'
+
+
+def derivative_formats():
+    """
+    Форматы производных изображений, которые умеет сохранять Pillow
+    """
+    Image.init()
+    return [fmt for fmt in DERIVATIVE_FORMATS if fmt.upper() in Image.SAVE]
+
+
+def derivative_name(name, width, fmt):
+    """
+    Имя файла производного изображения рядом с оригиналом
+    """
+    root, _ = os.path.splitext(name)
+    return f'{root}_{width}w.{fmt}'
+
+
+def image_srcset(field_file, build_url=None):
+    """
+    Ссылки на оригинал и производные изображения вида {'webp': {'160w': url, ...}, 'original': url}
+
+    Выводятся только производные изображения, созданные для текущего файла
+    """
+    if not field_file:
+        return {}
+    storage = field_file.storage
+    build_url = build_url or (lambda url: url)
+    srcset = {'original': build_url(field_file.url)}
+    derivatives = getattr(field_file.instance, derivatives_field_name(field_file.field.name), None) or {}
+    if derivatives.get('name') == field_file.name:
+        for fmt, names in derivatives['files'].items():
+            srcset[fmt] = {f'{width}w': build_url(storage.url(name)) for width, name in names.items()}
+    return srcset
+
+
+def derivative_widths(image_width):
+    """
+    Ширины производных изображений без увеличения оригинала
+
+    Оригинал уже остальных размеров сохраняется только в своей ширине
+    """
+    widths = {width for width in DERIVATIVE_WIDTHS if width < image_width}
+    widths.add(min(image_width, max(DERIVATIVE_WIDTHS)))
+    return sorted(widths)
+
+
+def generate_derivatives(field_file):
+    """
+    Создание производных изображений всех размеров и форматов
+
+    Возвращает запись о созданных файлах вида {'name': оригинал, 'files': {'webp': {'160': имя, ...}}}
+    """
+    storage = field_file.storage
+    with field_file.open('rb') as file:
+        image = Image.open(file)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+    files = {fmt: {} for fmt in derivative_formats()}
+    for width in derivative_widths(image.width):
+        resized = image
+        if image.width > width:
+            resized = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        for fmt in files:
+            buffer = BytesIO()
+            resized.save(buffer, fmt.upper(), quality=DERIVATIVE_QUALITY)
+            name = derivative_name(field_file.name, width, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            files[fmt][str(width)] = storage.save(name, ContentFile(buffer.getvalue()))
+    return {'name': field_file.name, 'files': files}
+
+
+def derivative_file_names(derivatives):
+    """
+    Имена файлов из записи о производных изображениях
+    """
+    return [name for names in (derivatives or {}).get('files', {}).values() for name in names.values()]
+
+
+def delete_derivatives(storage, derivatives, keep=()):
+    """
+    Удаление файлов производных изображений по записи о них, кроме файлов из keep
+    """
+    for name in derivative_file_names(derivatives):
+        if name not in keep:
+            storage.delete(name)
+
+
+def pending_derivatives(queryset, field_name):
+    """
+    Объекты, запись о производных изображениях которых не соответствует текущему изображению
+
+    Запись хранится в базе данных, поэтому изображения, загруженные до остановки обработчика,
+    будут обработаны после его запуска
+    """
+    queryset = queryset.annotate(derivatives_of=KeyTextTransform('name', derivatives_field_name(field_name)))
+    return queryset.filter(Q(derivatives_of__isnull=True) & ~Q(**{field_name: ''})
+                           | Q(derivatives_of__isnull=False) & ~Q(derivatives_of=F(field_name)))
+
+
+def generate_model_derivatives(model_label, pk, field_name):
+    """
+    Создание производных изображений для поля объекта, запись о них в объект
+    и удаление производных изображений замененного изображения
+    """
+    model = apps.get_model(model_label)
+    instance = model._default_manager.filter(pk=pk).first()
+    if instance is None:
+        return
+    field_file = getattr(instance, field_name)
+    old_derivatives = getattr(instance, derivatives_field_name(field_name))
+    derivatives = generate_derivatives(field_file) if field_file else {}
+    queryset = model._default_manager.filter(pk=pk, **{field_name: field_file.name})
+    if not queryset.exists():
+        # Изображение заменено, пока создавались производные
+        delete_derivatives(field_file.storage, derivatives)
+        return
+    setattr(instance, derivatives_field_name(field_name), derivatives)
+    instance._derivatives_generated = True
+    update_fields = [derivatives_field_name(field_name)]
+    if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+        update_fields.append('updated_at')
+    instance.save(update_fields=update_fields)
+    # Файлы с теми же именами перезаписаны новыми производными изображениями
+    delete_derivatives(field_file.storage, old_derivatives, keep=set(derivative_file_names(derivatives)))
+
+
+def delete_model_derivatives(model_label, field_name, derivatives):
+    """
+    Удаление производных изображений удаленного объекта
+    """
+    delete_derivatives(apps.get_model(model_label)._meta.get_field(field_name).storage, derivatives)
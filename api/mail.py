@@ -0,0 +1,161 @@
+import base64
+from datetime import timedelta
+from email.mime.base import MIMEBase
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction, connection as db_connection
+from django.utils import timezone
+
+from api.models import OutgoingEmail
+
+
+def get_delivery_connection():
+    """
+    Соединение бэкенда, через который письма из очереди отправляются получателям
+    """
+    return get_connection(getattr(settings, 'OUTBOX_DELIVERY_BACKEND',
+                                  'django.core.mail.backends.smtp.EmailBackend'))
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    Почтовый бэкенд, сохраняющий письма в очередь OutgoingEmail
+
+    Письма отправляются командой manage.py send_outbox
+    """
+    def send_messages(self, email_messages):
+        rows = [OutgoingEmail(
+            subject=message.subject,
+            body=message.body,
+            from_email=message.from_email or settings.DEFAULT_FROM_EMAIL or '',
+            to=list(message.to),
+            cc=list(message.cc),
+            bcc=list(message.bcc),
+            reply_to=list(message.reply_to),
+            alternatives=[list(alternative) for alternative in getattr(message, 'alternatives', [])],
+            attachments=[dump_attachment(attachment) for attachment in message.attachments],
+            content_subtype=message.content_subtype,
+            headers=message.extra_headers,
+        ) for message in email_messages if message.recipients()]
+        OutgoingEmail.objects.bulk_create(rows)
+        return len(rows)
+
+
+def dump_attachment(attachment):
+    """
+    Вложение письма в виде, пригодном для JSON (двоичное содержимое кодируется в base64)
+
+    Готовые MIME части не сохраняются: их нельзя восстановить без потерь
+    """
+    if isinstance(attachment, MIMEBase):
+        raise ValueError('Вложения MIMEBase не поддерживаются очередью писем, используйте attach(filename, content, '
+                         'mimetype)')
+    filename, content, mimetype = attachment
+    if isinstance(content, bytes):
+        return {'filename': filename, 'content': base64.b64encode(content).decode(), 'mimetype': mimetype,
+                'base64': True}
+    return {'filename': filename, 'content': content, 'mimetype': mimetype, 'base64': False}
+
+
+def load_attachment(data):
+    """
+    Вложение письма из сохраненного вида
+    """
+    content = base64.b64decode(data['content']) if data['base64'] else data['content']
+    return data['filename'], content, data['mimetype']
+
+
+def build_message(row, connection=None):
+    """
+    Письмо из строки очереди
+    """
+    message = EmailMultiAlternatives(
+        subject=row.subject,
+        body=row.body,
+        from_email=row.from_email,
+        to=row.to,
+        cc=row.cc,
+        bcc=row.bcc,
+        reply_to=row.reply_to,
+        headers=row.headers,
+        connection=connection,
+    )
+    message.content_subtype = row.content_subtype
+    for content, mimetype in row.alternatives:
+        message.attach_alternative(content, mimetype)
+    for attachment in row.attachments:
+        message.attach(*load_attachment(attachment))
+    return message
+
+
+def claim_outbox(batch_size=100):
+    """
+    Захват пачки писем из очереди в короткой транзакции
+
+    Захваченные письма получают статус "отправляется" и аренду на OUTBOX_LEASE секунд:
+    письмо, не отправленное за это время (например, обработчик остановился), захватывается снова
+    """
+    max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+    now = timezone.now()
+    with transaction.atomic():
+        expired = OutgoingEmail.objects.filter(status=OutgoingEmail.StatusChoices.SENDING, next_attempt_at__lte=now)
+        expired.filter(attempts__gte=max_attempts).update(
+            status=OutgoingEmail.StatusChoices.FAILED, last_error='Истекла аренда отправки', updated_at=now)
+
+        queryset = OutgoingEmail.objects.filter(
+            status__in=(OutgoingEmail.StatusChoices.PENDING, OutgoingEmail.StatusChoices.SENDING),
+            next_attempt_at__lte=now)
+        if db_connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        rows = list(queryset.order_by('next_attempt_at', 'id')[:batch_size])
+
+        lease_until = now + timedelta(seconds=getattr(settings, 'OUTBOX_LEASE', 300))
+        for row in rows:
+            row.status = OutgoingEmail.StatusChoices.SENDING
+            row.next_attempt_at = lease_until
+            row.attempts += 1
+            row.updated_at = now
+        OutgoingEmail.objects.bulk_update(rows, ['status', 'next_attempt_at', 'attempts', 'updated_at'])
+    return rows
+
+
+def deliver_outbox(batch_size=100, connection=None):
+    """
+    Отправка пачки писем из очереди через одно соединение
+
+    Письма отправляются вне транзакции, результат каждого письма сохраняется сразу после отправки.
+    Возвращает количество отправленных и неотправленных писем
+    """
+    own_connection = connection is None
+    if own_connection:
+        connection = get_delivery_connection()
+    max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+    # Задержка перед повторной отправкой удваивается с каждой попыткой
+    retry_delay = getattr(settings, 'OUTBOX_RETRY_DELAY', 60)
+    sent = failed = 0
+    for row in claim_outbox(batch_size):
+        try:
+            # Открытое соединение переиспользуется, закрытое открывается заново
+            connection.open()
+            build_message(row, connection).send()
+        except Exception as exc:
+            # Соединение могло оборваться, перед следующим письмом оно будет открыто заново
+            connection.close()
+            row.last_error = repr(exc)
+            if row.attempts >= max_attempts:
+                row.status = OutgoingEmail.StatusChoices.FAILED
+            else:
+                row.status = OutgoingEmail.StatusChoices.PENDING
+                row.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay * 2 ** (row.attempts - 1))
+            failed += 1
+        else:
+            row.status = OutgoingEmail.StatusChoices.SENT
+            row.sent_at = timezone.now()
+            row.last_error = ''
+            sent += 1
+        row.save(update_fields=['status', 'next_attempt_at', 'last_error', 'sent_at', 'updated_at'])
+    if own_connection:
+        connection.close()
+    return sent, failed
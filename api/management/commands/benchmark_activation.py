@@ -0,0 +1,50 @@
+import statistics
+import time
+
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.urls import resolve
+from djoser.compat import get_user_email
+from djoser.utils import encode_uid
+
+from api.models import User, OutgoingEmail
+
+
+class Command(BaseCommand):
+    help = ('Измеряет задержку активации профиля (UserActivationView) по ссылке из письма '
+            'вместе с постановкой письма о подтверждении в очередь; созданные строки удаляются')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Количество активаций')
+        parser.add_argument('--host', default='localhost',
+                            help='Заголовок Host запросов')
+
+    def handle(self, *args, **options):
+        factory = RequestFactory(HTTP_HOST=options['host'])
+        latencies = []
+        last_email_id = OutgoingEmail.objects.order_by('-id').values_list('id', flat=True).first() or 0
+        users = [User.objects.create_user(email=f'benchmark{number}@dvfu.ru', is_active=False)
+                 for number in range(options['requests'])]
+        try:
+            for user in users:
+                path = f'/api/activate/{encode_uid(user.pk)}/{default_token_generator.make_token(user)}/'
+                match = resolve(path)
+                started = time.perf_counter()
+                response = match.func(factory.get(path), *match.args, **match.kwargs)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 302:
+                    self.stderr.write(f'{path}: {response.status_code}')
+            activated = User.objects.filter(pk__in=[user.pk for user in users], is_active=True).count()
+        finally:
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+            emails = {get_user_email(user) for user in users}
+            OutgoingEmail.objects.filter(id__in=[row.id for row in OutgoingEmail.objects.filter(id__gt=last_email_id)
+                                                 if emails.intersection(row.to)]).delete()
+
+        latencies.sort()
+        self.stdout.write(f'Активация: {activated} из {len(users)}, '
+                          f'медиана {statistics.median(latencies) * 1000:.2f} мс, '
+                          f'p95 {latencies[int(len(latencies) * 0.95)] * 1000:.2f} мс, '
+                          f'p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} мс')
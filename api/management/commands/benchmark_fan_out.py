@@ -0,0 +1,46 @@
+import time
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import User, Notification
+from api.notifications import fan_out, FAN_OUT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = ('Измеряет массовое создание уведомлений (по умолчанию 50 000 получателей) '
+            'в сравнении с созданием по одному; созданные строки откатываются')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recipients', type=int, default=50000,
+                            help='Количество получателей (пользователи повторяются, если их меньше)')
+        parser.add_argument('--batch-size', type=int, default=FAN_OUT_BATCH_SIZE,
+                            help='Размер пачки bulk_create')
+        parser.add_argument('--single', type=int, default=1000,
+                            help='Количество уведомлений, создаваемых по одному для сравнения (0 - не сравнивать)')
+
+    def handle(self, *args, **options):
+        user_ids = list(User.objects.order_by('id').values_list('id', flat=True)[:options['recipients']])
+        if not user_ids:
+            raise CommandError('Нет пользователей')
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            created = fan_out(islice(cycle(user_ids), options['recipients']), 'benchmark', '',
+                              options['batch_size'])
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+        self.stdout.write(f'fan_out: {created} уведомлений за {elapsed:.2f} с '
+                          f'({created / elapsed:.0f} в секунду, пачки по {options["batch_size"]})')
+
+        if options['single']:
+            with transaction.atomic():
+                started = time.perf_counter()
+                for user_id in islice(cycle(user_ids), options['single']):
+                    Notification.objects.create(user_id=user_id, message='benchmark', link='')
+                elapsed = time.perf_counter() - started
+                transaction.set_rollback(True)
+            self.stdout.write(f'По одному: {options["single"]} уведомлений за {elapsed:.2f} с '
+                              f'(~{elapsed / options["single"] * options["recipients"]:.1f} с '
+                              f'на {options["recipients"]})')
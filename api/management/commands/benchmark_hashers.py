@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+# Пароль, на котором измеряется скорость проверки
+BENCHMARK_PASSWORD = 'benchmark-password-1234'
+
+
+class Command(BaseCommand):
+    help = 'Измеряет количество проверок пароля (входов) в секунду на одно ядро для алгоритмов хеширования'
+
+    def add_arguments(self, parser):
+        parser.add_argument('hashers', nargs='*',
+                            help='Алгоритмы из PASSWORD_HASHER_CHOICES (по умолчанию все)')
+        parser.add_argument('--seconds', type=float, default=3,
+                            help='Длительность измерения одного алгоритма в секундах')
+
+    def handle(self, *args, **options):
+        choices = settings.PASSWORD_HASHER_CHOICES
+        for name in options['hashers'] or choices:
+            if name not in choices:
+                self.stderr.write(f'{name}: неизвестный алгоритм')
+                continue
+            hasher = import_string(choices[name])()
+            try:
+                encoded = hasher.encode(BENCHMARK_PASSWORD, hasher.salt())
+            except ValueError as exc:
+                self.stderr.write(f'{name}: недоступен ({exc})')
+                continue
+
+            count = 0
+            started = time.perf_counter()
+            elapsed = 0
+            while elapsed < options['seconds']:
+                hasher.verify(BENCHMARK_PASSWORD, encoded)
+                count += 1
+                elapsed = time.perf_counter() - started
+            self.stdout.write(f'{name}: {count / elapsed:.1f} входов/с на ядро '
+                              f'({elapsed / count * 1000:.1f} мс на проверку)')
@@ -0,0 +1,78 @@
+import time
+import tracemalloc
+from io import BytesIO
+
+from PIL import Image
+from django.core.management.base import BaseCommand
+
+from api.validators import ImageOpenValidator, EXTENSION_FORMATS, read_image_header
+
+# Сторона квадратного изображения из шума, дающего около 1 МБ в формате PNG
+SIDE_PER_MEGABYTE = 700
+
+
+class Command(BaseCommand):
+    help = ('Измеряет время и пиковую память проверки большого изображения (по умолчанию около 20 МБ) '
+            'по заголовку в сравнении с полным декодированием Pillow')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?',
+                            help='Файл изображения (по умолчанию создается изображение из шума)')
+        parser.add_argument('--megabytes', type=float, default=20,
+                            help='Примерный размер создаваемого изображения в МБ')
+        parser.add_argument('--format', choices=('png', 'jpeg'), default='png',
+                            help='Формат создаваемого изображения')
+        parser.add_argument('--repeat', type=int, default=20,
+                            help='Количество повторов каждого измерения')
+
+    def handle(self, *args, **options):
+        if options['path']:
+            with open(options['path'], 'rb') as file:
+                data = file.read()
+        else:
+            data = self._noise_image(options['megabytes'], options['format'])
+        header = read_image_header(BytesIO(data))
+        self.stdout.write(f'Изображение: {len(data) / 2 ** 20:.1f} МБ, '
+                          f'{header.format if header else "не распознано"} '
+                          f'{header.width if header else "?"}x{header.height if header else "?"}')
+
+        validator = ImageOpenValidator(extensions=list(EXTENSION_FORMATS))
+        for name, func in (('read_image_header', read_image_header),
+                           ('ImageOpenValidator', validator)):
+            elapsed, peak = self._measure(func, data, options['repeat'])
+            self.stdout.write(f'{name}: {elapsed * 1000:.3f} мс, пик памяти {peak / 1024:.1f} КБ')
+
+        # Пиксели Pillow выделяются вне tracemalloc, поэтому для декодирования выводится их размер
+        elapsed, peak = self._measure(self._decode, data, options['repeat'])
+        with Image.open(BytesIO(data)) as image:
+            pixels = image.width * image.height * len(image.getbands())
+        self.stdout.write(f'Pillow Image.open().load(): {elapsed * 1000:.3f} мс, '
+                          f'декодированные пиксели {pixels / 2 ** 20:.1f} МБ')
+
+    def _decode(self, file):
+        with Image.open(file) as image:
+            image.load()
+
+    def _noise_image(self, megabytes, fmt):
+        side = round(SIDE_PER_MEGABYTE * megabytes ** 0.5)
+        buffer = BytesIO()
+        Image.effect_noise((side, side), 100).convert('RGB').save(buffer, fmt.upper(), quality=100)
+        return buffer.getvalue()
+
+    def _measure(self, func, data, repeat):
+        """
+        Среднее время вызова и пиковая память, выделенная при вызове
+        """
+        file = BytesIO(data)
+        started = time.perf_counter()
+        for _ in range(repeat):
+            file.seek(0)
+            func(file)
+        elapsed = (time.perf_counter() - started) / repeat
+
+        file.seek(0)
+        tracemalloc.start()
+        func(file)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return elapsed, peak
@@ -0,0 +1,102 @@
+import asyncio
+import statistics
+import time
+import tracemalloc
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import User, Notification
+from api.realtime import get_broker, notification_stream, publish_notifications
+from api.serializers.token_serializer import TokenObtainPairWithClaimsSerializer
+
+
+class BenchmarkConnection:
+    """
+    Подключение к потоку уведомлений с заглушками receive/send ASGI
+    """
+    def __init__(self, user_id, token):
+        self.user_id = user_id
+        self.scope = {'type': 'http', 'path': '/api/notification/stream/', 'headers': [],
+                      'query_string': f'token={token}'.encode()}
+        loop = asyncio.get_event_loop()
+        self.started = loop.create_future()
+        self.disconnected = loop.create_future()
+        self.received = asyncio.Queue()
+
+    async def receive(self):
+        await self.disconnected
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            self.started.set_result(message['status'])
+        elif message['body'].startswith(b'event:'):
+            self.received.put_nowait(time.perf_counter())
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный тест потока уведомлений: открывает простаивающие подключения в одном процессе, '
+            'измеряет память, задержку доставки и публикацию уведомлений без подписчиков')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--connections', type=int, default=10000,
+                            help='Количество простаивающих подключений')
+        parser.add_argument('--users', type=int, default=1000,
+                            help='Количество активных пользователей, между которыми делятся подключения')
+        parser.add_argument('--messages', type=int, default=200,
+                            help='Количество событий для измерения задержки доставки')
+        parser.add_argument('--fan-out', type=int, default=20000,
+                            help='Количество уведомлений пользователям без подписчиков')
+
+    def handle(self, *args, **options):
+        users = list(User.objects.filter(is_active=True).order_by('id')[:options['users']])
+        if not users:
+            raise CommandError('Нет активных пользователей')
+        tokens = [(user.id, str(TokenObtainPairWithClaimsSerializer.get_token(user).access_token))
+                  for user in users]
+        asyncio.run(self._run(tokens, options))
+
+    async def _run(self, tokens, options):
+        tracemalloc.start()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        connections = [BenchmarkConnection(user_id, token)
+                       for user_id, token in islice(cycle(tokens), options['connections'])]
+        tasks = [asyncio.ensure_future(notification_stream(connection.scope, connection.receive, connection.send))
+                 for connection in connections]
+        statuses = await asyncio.gather(*(connection.started for connection in connections))
+        elapsed = time.perf_counter() - started
+        await asyncio.sleep(0.1)
+        memory = tracemalloc.get_traced_memory()[0] - memory_before
+        tracemalloc.stop()
+        opened = statuses.count(200)
+        self.stdout.write(f'Подключения: {opened} из {len(connections)} открыты за {elapsed:.2f} с, '
+                          f'память {memory / 2 ** 20:.1f} МБ ({memory / max(opened, 1) / 1024:.1f} КБ на подключение)')
+
+        broker = get_broker()
+        loop = asyncio.get_event_loop()
+        latencies = []
+        # Одно подключение на пользователя: событие доставляется во все его подключения
+        targets = {connection.user_id: connection for connection in connections}
+        for connection in islice(cycle(targets.values()), options['messages']):
+            while not connection.received.empty():
+                connection.received.get_nowait()
+            sent_at = time.perf_counter()
+            await loop.run_in_executor(None, broker.publish, connection.user_id, {'message': 'benchmark'})
+            latencies.append(await connection.received.get() - sent_at)
+        latencies.sort()
+        self.stdout.write(f'Задержка доставки: медиана {statistics.median(latencies) * 1000:.2f} мс, '
+                          f'p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} мс')
+
+        missing_id = max(targets) + 1
+        notifications = [Notification(user_id=missing_id + number, message='benchmark', link='')
+                         for number in range(options['fan_out'])]
+        started = time.perf_counter()
+        await loop.run_in_executor(None, publish_notifications, notifications)
+        self.stdout.write(f'Публикация {len(notifications)} уведомлений без подписчиков: '
+                          f'{time.perf_counter() - started:.3f} с')
+
+        for connection in connections:
+            connection.disconnected.set_result(None)
+        await asyncio.gather(*tasks)
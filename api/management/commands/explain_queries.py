@@ -0,0 +1,69 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from api.models import Event, Organization, Notification, MembersInOrganization
+
+
+# Последовательное сканирование в планах PostgreSQL и SQLite
+SEQ_SCAN_PATTERN = re.compile(r'Seq Scan|\bSCAN (TABLE )?\w+\s*$', re.MULTILINE)
+
+
+def canonical_queries(user_id):
+    """
+    Основные запросы API
+    """
+    today = timezone.localdate()
+    return [
+        ('event_feed', Event.objects
+            .filter(status=Event.StatusChoices.VERIFY, date__gte=today)
+            .order_by('date')),
+        ('event_moderation', Event.objects
+            .filter(status=Event.StatusChoices.NEW)
+            .order_by('date')),
+        ('event_list_page', Event.objects
+            .order_by('-created_at', '-id')),
+        ('organization_moderation', Organization.objects
+            .filter(status=Organization.StatusChoices.NEW)),
+        ('notification_inbox', Notification.objects
+            .filter(user_id=user_id)
+            .order_by('viewed', '-created_at')),
+        ('notification_unviewed', Notification.objects
+            .filter(user_id=user_id, viewed=False)
+            .order_by('-created_at')),
+        ('organization_leaders', MembersInOrganization.objects
+            .filter(organization_id=1, role__in=['leader', 'admin'])),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Выводит планы выполнения (EXPLAIN) основных запросов API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, default=1,
+                            help='id пользователя для запросов уведомлений')
+        parser.add_argument('--analyze', action='store_true',
+                            help='Выполнить EXPLAIN ANALYZE (только PostgreSQL)')
+        parser.add_argument('--fail-on-seq-scan', action='store_true',
+                            help='Завершиться с ошибкой, если в плане есть последовательное сканирование')
+
+    def handle(self, *args, **options):
+        explain_options = {}
+        if options['analyze']:
+            if connection.vendor != 'postgresql':
+                raise CommandError('--analyze поддерживается только для PostgreSQL')
+            explain_options['analyze'] = True
+
+        seq_scans = []
+        for name, queryset in canonical_queries(options['user']):
+            plan = queryset.explain(**explain_options)
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(plan)
+            self.stdout.write('')
+            if SEQ_SCAN_PATTERN.search(plan):
+                seq_scans.append(name)
+
+        if seq_scans and options['fail_on_seq_scan']:
+            raise CommandError('Последовательное сканирование в запросах: ' + ', '.join(seq_scans))
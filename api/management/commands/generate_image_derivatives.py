@@ -0,0 +1,57 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from api.images import IMAGE_FIELDS, derivatives_field_name, generate_model_derivatives, pending_derivatives
+
+
+class Command(BaseCommand):
+    help = ('Создает производные изображения для изображений, у которых их нет или они созданы для '
+            'замененного изображения, и удаляет производные изображения замененных изображений')
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*',
+                            help=f'Модели ({", ".join(IMAGE_FIELDS)}), по умолчанию все')
+        parser.add_argument('--force', action='store_true',
+                            help='Пересоздать производные изображения и для объектов, у которых они есть')
+        parser.add_argument('--loop', action='store_true',
+                            help='Работать постоянно, проверяя новые изображения с интервалом --interval')
+        parser.add_argument('--interval', type=float, default=10,
+                            help='Интервал проверки новых изображений в секундах')
+
+    def handle(self, *args, **options):
+        labels = options['models'] or list(IMAGE_FIELDS)
+        for label in labels:
+            if label not in IMAGE_FIELDS:
+                raise CommandError(f'{label}: модель без производных изображений')
+        force = options['force']
+        while True:
+            for label in labels:
+                self._generate(label, force)
+            if not options['loop']:
+                break
+            force = False
+            time.sleep(options['interval'])
+
+    def _generate(self, label, force):
+        field_name = IMAGE_FIELDS[label]
+        queryset = apps.get_model(label)._default_manager.all()
+        if force:
+            queryset = queryset.exclude(**{field_name: ''})
+        else:
+            queryset = pending_derivatives(queryset, field_name)
+        generated = failed = 0
+        for pk, name in list(queryset.values_list('pk', field_name)):
+            try:
+                generate_model_derivatives(label, pk, field_name)
+            except Exception as exc:
+                self.stderr.write(f'{label} {pk}: {exc!r}')
+                # Пустая запись, чтобы не повторять ошибку на каждой проверке (повтор - с --force)
+                queryset.model._default_manager.filter(pk=pk, **{field_name: name}).update(
+                    **{derivatives_field_name(field_name): {'name': name, 'files': {}}})
+                failed += 1
+            else:
+                generated += 1
+        if generated or failed:
+            self.stdout.write(f'{label}: обработано {generated}, ошибок {failed}')
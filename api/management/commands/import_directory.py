@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.directory import DirectoryImporter, IMPORT_BATCH_SIZE, read_rows
+from api.passwords import PasswordHashPool
+
+
+class Command(BaseCommand):
+    help = ('Импортирует школы, факультеты, пользователей и членство в организациях из CSV или JSONL. '
+            'Колонки: email, password, name, surname, fathers_name, education_level, education_year, '
+            'phone, school, faculty, organization (id), role')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу CSV или JSONL')
+        parser.add_argument('--format', choices=('csv', 'jsonl'),
+                            help='Формат файла (по умолчанию определяется по расширению)')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+                            help='Количество строк в одной транзакции')
+        parser.add_argument('--workers', type=int,
+                            help='Количество процессов хеширования паролей (по умолчанию PASSWORD_HASH_WORKERS)')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+        try:
+            file = open(path, encoding='utf-8-sig', newline='')
+        except OSError as exc:
+            raise CommandError(f'Не удалось открыть файл: {exc}')
+
+        started = time.monotonic()
+        with file, PasswordHashPool(options['workers']) as hash_pool:
+            importer = DirectoryImporter(hash_pool, options['batch_size'])
+            for processed in importer.import_rows(read_rows(file, file_format)):
+                elapsed = time.monotonic() - started
+                self.stdout.write(f'Обработано строк: {processed} ({processed / elapsed:.0f} строк/с)')
+
+        elapsed = time.monotonic() - started
+        stats = importer.stats
+        for error in importer.errors:
+            self.stderr.write(error)
+        self.stdout.write(
+            f'Готово за {elapsed:.1f} с ({stats["rows"] / elapsed if elapsed else 0:.0f} строк/с): '
+            f'школ создано {stats["schools_created"]}, факультетов создано {stats["faculties_created"]}, '
+            f'пользователей создано {stats["users_created"]}, обновлено {stats["users_updated"]}, '
+            f'членств создано {stats["memberships_created"]}, обновлено {stats["memberships_updated"]}, '
+            f'ошибок {stats["errors"]}'
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.counters import repair_counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счетчики участников, организаторов и членов организаций'
+
+    def handle(self, *args, **options):
+        for counter, count in repair_counters().items():
+            self.stdout.write(f'{counter}: исправлено {count}')
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.mail import deliver_outbox, get_delivery_connection
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди OutgoingEmail через одно SMTP соединение'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Количество писем в одной пачке')
+        parser.add_argument('--loop', action='store_true',
+                            help='Работать постоянно, проверяя очередь с интервалом --interval')
+        parser.add_argument('--interval', type=float, default=5,
+                            help='Интервал проверки пустой очереди в секундах')
+
+    def handle(self, *args, **options):
+        connection = get_delivery_connection()
+        try:
+            while True:
+                sent, failed = deliver_outbox(options['batch_size'], connection)
+                if sent or failed:
+                    self.stdout.write(f'Отправлено: {sent}, ошибок: {failed}')
+                if sent + failed < options['batch_size']:
+                    if not options['loop']:
+                        break
+                    time.sleep(options['interval'])
+        finally:
+            connection.close()
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api.models import Event, Organization
+from api.search import is_full_text_supported, update_search_vectors
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает поисковые векторы мероприятий и организаций'
+
+    def handle(self, *args, **options):
+        if not is_full_text_supported():
+            self.stdout.write('Полнотекстовый поиск доступен только в PostgreSQL, пересчет не требуется')
+            return
+        for model in (Event, Organization):
+            count = update_search_vectors(model.objects.all())
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {count}')
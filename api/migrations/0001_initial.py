@@ -0,0 +1,286 @@
+# Generated by Django 3.1.3 on 2026-10-18 16:26
+
+import api.models
+import api.validators
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='User',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('password', models.CharField(max_length=128, verbose_name='password')),
+                ('last_login', models.DateTimeField(blank=True, null=True, verbose_name='last login')),
+                ('is_superuser', models.BooleanField(default=False, help_text='Designates that this user has all permissions without explicitly assigning them.', verbose_name='superuser status')),
+                ('first_name', models.CharField(blank=True, max_length=150, verbose_name='first name')),
+                ('last_name', models.CharField(blank=True, max_length=150, verbose_name='last name')),
+                ('is_staff', models.BooleanField(default=False, help_text='Designates whether the user can log into this admin site.', verbose_name='staff status')),
+                ('is_active', models.BooleanField(default=True, help_text='Designates whether this user should be treated as active. Unselect this instead of deleting accounts.', verbose_name='active')),
+                ('date_joined', models.DateTimeField(default=django.utils.timezone.now, verbose_name='date joined')),
+                ('email', models.EmailField(max_length=254, unique=True, verbose_name='Email')),
+                ('image', models.ImageField(blank=True, upload_to='', validators=[api.validators.ImageResolutionValidator(extensions=['jpg', 'png'], max_height=1600, max_width=1600)], verbose_name='Аватар пользователя')),
+                ('name', models.CharField(blank=True, default='', max_length=256, verbose_name='Имя')),
+                ('surname', models.CharField(blank=True, default='', max_length=256, verbose_name='Фамилия')),
+                ('fathers_name', models.CharField(blank=True, default='', max_length=256, verbose_name='Отчество')),
+                ('education_level', models.CharField(choices=[('bachelor', 'Бакалавриат'), ('specialty', 'Специалитет'), ('magistracy', 'Магистратура'), ('graduate_school', 'Аспирантура'), ('other', 'Другое')], default='bachelor', max_length=20, verbose_name='Статус')),
+                ('education_year', models.CharField(blank=True, default='', max_length=256, verbose_name='Год обучения')),
+                ('phone', models.CharField(blank=True, max_length=256, validators=[django.core.validators.RegexValidator(message="Phone number is invalid. Try: '+(country code)(number)'. example: +79123456789.", regex='^\\+\\d{10,15}$')], verbose_name='мобильный телефон')),
+                ('social_1', models.URLField(blank=True, default='', verbose_name='ссылка на соц.сеть 1')),
+                ('social_2', models.URLField(blank=True, default='', verbose_name='ссылка на соц.сеть 2')),
+                ('social_3', models.URLField(blank=True, default='', verbose_name='ссылка на соц.сеть 3')),
+                ('email_notification', models.BooleanField(default=False, verbose_name='email-уведомления')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Пользователь',
+                'verbose_name_plural': 'Пользователи',
+            },
+            managers=[
+                ('objects', api.models.UserManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Event',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, verbose_name='Название мероприятия')),
+                ('image', models.ImageField(blank=True, upload_to='', validators=[api.validators.ImageResolutionValidator(extensions=['jpg', 'png'], max_height=1600, max_width=1600)], verbose_name='Картинка мероприятия')),
+                ('time', models.TimeField(verbose_name='Время проведения')),
+                ('auditorium', models.CharField(max_length=64, verbose_name='Место проведения/Аудитория')),
+                ('date', models.DateField(verbose_name='Дата проведения')),
+                ('date_end', models.DateField(verbose_name='Дата окончания')),
+                ('level', models.CharField(choices=[('international', 'Международный'), ('country', 'Всероссийский'), ('regional', 'Региональный'), ('university', 'Университетский')], default='university', max_length=64, verbose_name='Уровень мероприятия')),
+                ('status', models.CharField(choices=[('new', 'Новое'), ('in_release', 'В релизе'), ('verify', 'Верифицированное'), ('denied', 'Отказано')], default='new', max_length=64, verbose_name='Статус')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Мероприятие',
+                'verbose_name_plural': 'Мероприятия',
+            },
+        ),
+        migrations.CreateModel(
+            name='EventCategory',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+            ],
+            options={
+                'verbose_name': 'Категория события',
+                'verbose_name_plural': 'Категории событий',
+            },
+        ),
+        migrations.CreateModel(
+            name='EventType',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+            ],
+            options={
+                'verbose_name': 'Тип события',
+                'verbose_name_plural': 'Типы событий',
+            },
+        ),
+        migrations.CreateModel(
+            name='MembersInOrganization',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('member', 'Член организации'), ('leader', 'Глава/исполняющий обязанности организации'), ('admin', 'Админимтратор')], default='member', max_length=10, verbose_name='роль в организации')),
+                ('organization_confirm', models.BooleanField(default=False, verbose_name='Подтверждение организации')),
+                ('user_confirm', models.BooleanField(default=False, verbose_name='Подтверждение пользователя')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Член организации',
+                'verbose_name_plural': 'Члены организации',
+            },
+        ),
+        migrations.CreateModel(
+            name='School',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+            ],
+            options={
+                'verbose_name': 'Школа',
+                'verbose_name_plural': 'Школы',
+            },
+        ),
+        migrations.CreateModel(
+            name='Slide',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+                ('img', models.ImageField(upload_to='', verbose_name='Изображение')),
+                ('link', models.CharField(max_length=250, verbose_name='Ссылка')),
+            ],
+            options={
+                'verbose_name': 'Слайд',
+                'verbose_name_plural': 'Слайды',
+            },
+        ),
+        migrations.CreateModel(
+            name='Organization',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, verbose_name='Название организации')),
+                ('image', models.ImageField(blank=True, upload_to='', validators=[api.validators.ImageResolutionValidator(extensions=['jpg', 'png'], max_height=1600, max_width=1600)], verbose_name='Аватар организации')),
+                ('description', models.TextField(blank=True, default='', verbose_name='Описание')),
+                ('mission', models.TextField(blank=True, default='', verbose_name='Миссия')),
+                ('motivation', models.TextField(blank=True, default='', verbose_name='Мотивировка')),
+                ('work_trajectory', models.TextField(blank=True, default='', verbose_name='Траектория работы')),
+                ('goal', models.TextField(blank=True, default='', verbose_name='Цель')),
+                ('social_network_1', models.URLField(blank=True, verbose_name='ссылка на соцсеть 1')),
+                ('social_network_2', models.URLField(blank=True, verbose_name='ссылка на соцсеть 2')),
+                ('phone', models.CharField(blank=True, max_length=256, validators=[django.core.validators.RegexValidator(message="Phone number is invalid. Try: '+(country code)(number)'. example: +79123456789.", regex='^\\+\\d{10,15}$')])),
+                ('email', models.EmailField(blank=True, max_length=254, verbose_name='email')),
+                ('status', models.CharField(choices=[('new', 'Новая'), ('verify', 'Верифицированная'), ('denied', 'Отказано')], default='new', max_length=20, verbose_name='Статус')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('members', models.ManyToManyField(blank=True, through='api.MembersInOrganization', to=settings.AUTH_USER_MODEL, verbose_name='участники организации')),
+            ],
+            options={
+                'verbose_name': 'Организация',
+                'verbose_name_plural': 'Организации',
+            },
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('message', models.TextField(verbose_name='Уведомление')),
+                ('link', models.CharField(max_length=250, verbose_name='Ссылка')),
+                ('viewed', models.BooleanField(default=False, verbose_name='Просмотренно')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Участник')),
+            ],
+            options={
+                'verbose_name': 'Уведомление',
+                'verbose_name_plural': 'Уведомления',
+            },
+        ),
+        migrations.AddField(
+            model_name='membersinorganization',
+            name='organization',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.organization', verbose_name='организация'),
+        ),
+        migrations.AddField(
+            model_name='membersinorganization',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='пользователь'),
+        ),
+        migrations.CreateModel(
+            name='Faculty',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Название')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.school', verbose_name='Школа')),
+            ],
+            options={
+                'verbose_name': 'Факультет',
+                'verbose_name_plural': 'Факультеты',
+            },
+        ),
+        migrations.CreateModel(
+            name='EventOrganizers',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(blank=True, choices=[('leader', 'Руководитель'), ('manager', 'Организатор'), ('executor', 'Исполнитель'), ('volunteer', 'волонтер')], default='volunteer', max_length=64, null=True, verbose_name='Роль участника')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.event', verbose_name='Мероприятие')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Участник')),
+            ],
+            options={
+                'verbose_name': 'Организатор мероприятия',
+                'verbose_name_plural': 'Организаторы мероприятий',
+            },
+        ),
+        migrations.CreateModel(
+            name='EventGuests',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.event', verbose_name='Мероприятие')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Участник')),
+            ],
+            options={
+                'verbose_name': 'Гость мероприятия',
+                'verbose_name_plural': 'Гости мероприятий',
+            },
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='event_category',
+            field=models.ManyToManyField(blank=True, related_name='event_category', to='api.EventCategory', verbose_name='Категории мероприятия'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='event_type',
+            field=models.ManyToManyField(blank=True, related_name='event_type', to='api.EventType', verbose_name='Типы мероприятия'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='guests',
+            field=models.ManyToManyField(blank=True, related_name='guests', to=settings.AUTH_USER_MODEL, verbose_name='Участники мероприятия'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='organization',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.organization', verbose_name='Организатор мероприятия'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='organizers',
+            field=models.ManyToManyField(blank=True, through='api.EventOrganizers', to=settings.AUTH_USER_MODEL, verbose_name='Организаторы мероприятия'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='faculty',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.faculty', verbose_name='Факультет'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='groups',
+            field=models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.Group', verbose_name='groups'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='school',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='api.school', verbose_name='Школа'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='user_permissions',
+            field=models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.Permission', verbose_name='user permissions'),
+        ),
+        migrations.AddConstraint(
+            model_name='membersinorganization',
+            constraint=models.UniqueConstraint(fields=('user', 'organization'), name='unique_member_in_organization'),
+        ),
+        migrations.AddConstraint(
+            model_name='eventorganizers',
+            constraint=models.UniqueConstraint(fields=('user', 'event'), name='unique_organizers_in_event'),
+        ),
+        migrations.AddConstraint(
+            model_name='eventguests',
+            constraint=models.UniqueConstraint(fields=('user', 'event'), name='unique_guest_in_event'),
+        ),
+    ]
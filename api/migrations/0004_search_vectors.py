@@ -0,0 +1,64 @@
+# Generated by Django 3.1.3 on 2026-10-18 16:26
+
+from functools import reduce
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+# Поля поиска и их веса на момент миграции (см. api.search.SEARCH_FIELDS)
+SEARCH_FIELDS = {
+    'Event': (('name', 'A'), ('auditorium', 'B')),
+    'Organization': (('name', 'A'), ('description', 'B'), ('mission', 'C'), ('goal', 'C')),
+}
+
+# GIN индексы поисковых векторов
+SEARCH_INDEXES = {
+    'Event': 'event_search_vector_idx',
+    'Organization': 'organization_search_vector_idx',
+}
+
+
+def fill_search_vectors(apps, schema_editor):
+    """
+    Заполнение поисковых векторов существующих строк и создание GIN индексов (только PostgreSQL)
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    quote_name = schema_editor.quote_name
+    for model_name, fields in SEARCH_FIELDS.items():
+        model = apps.get_model('api', model_name)
+        vectors = [SearchVector(field, weight=weight, config='russian') for field, weight in fields]
+        model.objects.using(schema_editor.connection.alias).update(
+            search_vector=reduce(lambda left, right: left + right, vectors))
+        schema_editor.execute(f'CREATE INDEX {quote_name(SEARCH_INDEXES[model_name])} '
+                              f'ON {quote_name(model._meta.db_table)} USING gin (search_vector)')
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name in SEARCH_INDEXES.values():
+        schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(index_name)}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_event_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        # GIN индекс не входит в состояние моделей: в других базах данных его нельзя создать
+        migrations.RunPython(fill_search_vectors, drop_search_indexes),
+    ]
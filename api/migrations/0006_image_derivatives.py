@@ -0,0 +1,33 @@
+# Generated by Django 3.1.3 on 2026-10-18 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Производные изображения'),
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Производные изображения'),
+        ),
+        migrations.AddField(
+            model_name='slide',
+            name='img_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Производные изображения'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Производные изображения'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.1.3 on 2026-10-18 16:26
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# Счетчики: модель строки -> (родительская модель, поле родительского объекта, поле счетчика)
+COUNTERS = {
+    'EventGuests': ('Event', 'event', 'guests_count'),
+    'EventOrganizers': ('Event', 'event', 'organizers_count'),
+    'MembersInOrganization': ('Organization', 'organization', 'members_count'),
+}
+
+
+def recount_counters(apps, schema_editor):
+    """
+    Заполнение счетчиков существующих мероприятий и организаций по строкам в базе данных
+    """
+    db_alias = schema_editor.connection.alias
+    for row_model_name, (parent_model_name, parent_field, count_field) in COUNTERS.items():
+        row_model = apps.get_model('api', row_model_name)
+        rows = (row_model.objects.using(db_alias).filter(**{parent_field: OuterRef('pk')})
+                .order_by().values(parent_field).annotate(count=Count('pk')).values('count'))
+        apps.get_model('api', parent_model_name).objects.using(db_alias).update(
+            **{count_field: Coalesce(Subquery(rows), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='guests_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество участников'),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='organizers_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество организаторов'),
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='members_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество участников'),
+        ),
+        migrations.RunPython(recount_counters, migrations.RunPython.noop),
+    ]
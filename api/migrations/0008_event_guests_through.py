@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def legacy_guests_model(apps):
+    """
+    Автоматическая модель старой связи Event.guests (таблица api_event_guests)
+    """
+    return apps.get_model('api', 'Event')._meta.get_field('guests').remote_field.through
+
+
+def merge_legacy_guests(apps, schema_editor):
+    """
+    Перенос гостей из старой таблицы связи в EventGuests без повторов и пересчет счетчиков
+    """
+    db_alias = schema_editor.connection.alias
+    Event = apps.get_model('api', 'Event')
+    EventGuests = apps.get_model('api', 'EventGuests')
+    LegacyGuests = legacy_guests_model(apps)
+
+    now = timezone.now()
+    rows = LegacyGuests.objects.using(db_alias).values_list('user_id', 'event_id').iterator(chunk_size=2000)
+    batch = []
+    for user_id, event_id in rows:
+        batch.append(EventGuests(user_id=user_id, event_id=event_id, created_at=now, updated_at=now))
+        if len(batch) >= 2000:
+            EventGuests.objects.using(db_alias).bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    EventGuests.objects.using(db_alias).bulk_create(batch, ignore_conflicts=True)
+
+    guests_count = (EventGuests.objects.using(db_alias).filter(event=OuterRef('pk'))
+                    .order_by().values('event').annotate(count=Count('pk')).values('count'))
+    Event.objects.using(db_alias).update(guests_count=Coalesce(Subquery(guests_count), 0))
+
+
+def drop_legacy_guests(apps, schema_editor):
+    schema_editor.delete_model(legacy_guests_model(apps))
+
+
+def restore_legacy_guests(apps, schema_editor):
+    """
+    Восстановление старой таблицы связи из EventGuests при откате миграции
+    """
+    db_alias = schema_editor.connection.alias
+    EventGuests = apps.get_model('api', 'EventGuests')
+    LegacyGuests = legacy_guests_model(apps)
+
+    schema_editor.create_model(LegacyGuests)
+    rows = EventGuests.objects.using(db_alias).values_list('user_id', 'event_id').iterator(chunk_size=2000)
+    batch = []
+    for user_id, event_id in rows:
+        batch.append(LegacyGuests(user_id=user_id, event_id=event_id))
+        if len(batch) >= 2000:
+            LegacyGuests.objects.using(db_alias).bulk_create(batch)
+            batch = []
+    LegacyGuests.objects.using(db_alias).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0007_counters'),
+    ]
+
+    operations = [
+        # Таблица api_eventguests уже существует, меняется только состояние поля,
+        # а данные старой таблицы переносятся в нее перед удалением
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='event',
+                    name='guests',
+                    field=models.ManyToManyField(blank=True, related_name='guests', through='api.EventGuests',
+                                                 to=settings.AUTH_USER_MODEL, verbose_name='Участники мероприятия'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(merge_legacy_guests, migrations.RunPython.noop),
+                migrations.RunPython(drop_legacy_guests, restore_legacy_guests),
+            ],
+        ),
+        # Отдельные индексы внешних ключей покрывают уникальный индекс (user, event) и индекс (event, user)
+        migrations.AddIndex(
+            model_name='eventguests',
+            index=models.Index(fields=['event', 'user'], name='event_guest_event_user_idx'),
+        ),
+        migrations.AlterField(
+            model_name='eventguests',
+            name='event',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='api.event',
+                                    verbose_name='Мероприятие'),
+        ),
+        migrations.AlterField(
+            model_name='eventguests',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE,
+                                    to=settings.AUTH_USER_MODEL, verbose_name='Участник'),
+        ),
+    ]
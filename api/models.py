@@ -1,11 +1,42 @@
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from functools import partial
 
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models, transaction
+from django.utils import timezone
+
+from api.caching import bump_version
+from api.passwords import PasswordHashPool
 from api.validators import phone_regex, image_validator
 
 
-class UserManager(BaseUserManager):
+# Поля пользователя, которые передаются в JWT (см. api.authentication)
+TOKEN_USER_FIELDS = ('email', 'is_staff', 'is_active', 'is_superuser')
+
+# Ключ кеша версии полей из JWT всех пользователей, увеличивается при массовом изменении пользователей
+USERS_TOKEN_VERSION_KEY = 'auth:users-version'
+
+
+class UserQuerySet(models.QuerySet):
+    """
+    Набор данных пользователей (Модель)
+    """
+    def update(self, **kwargs):
+        """
+        Массовое изменение пользователей
+
+        update() и bulk_update() не вызывают сигналы сохранения, поэтому при изменении полей из JWT
+        после фиксации транзакции сбрасываются версии полей всех пользователей
+        """
+        rows = super().update(**kwargs)
+        if rows and any(field in kwargs for field in TOKEN_USER_FIELDS):
+            transaction.on_commit(partial(bump_version, USERS_TOKEN_VERSION_KEY), using=self.db)
+        return rows
+    update.alters_data = True
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     """
     Менеджер пользователя (Модель)
     """
@@ -31,6 +62,20 @@ class UserManager(BaseUserManager):
         extra_fields.setdefault('is_superuser', False)
         return self._create_user(email, password, **extra_fields)
 
+    def bulk_create_users(self, users, passwords, hash_pool=None, batch_size=None):
+        """
+        Массовое создание пользователей с хешированием паролей в пуле процессов
+
+        passwords - пароли в порядке users (None - непригодный для входа пароль)
+        """
+        if hash_pool is None:
+            with PasswordHashPool() as pool:
+                return self.bulk_create_users(users, passwords, pool, batch_size)
+        for user, password_hash in zip(users, hash_pool.hash(passwords)):
+            user.email = self.normalize_email(user.email)
+            user.password = password_hash
+        return self.bulk_create(users, batch_size=batch_size)
+
     def create_superuser(self, email, password, **extra_fields):
         """
         Создание суперпользователя
@@ -46,6 +91,25 @@ class UserManager(BaseUserManager):
         return self._create_user(email, password, **extra_fields)
 
 
+class CountersModel(models.Model):
+    """
+    Модель со счетчиками, которые изменяются только F() выражениями (Модель)
+    """
+    counter_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        """
+        Сохранение без перезаписи счетчиков устаревшими значениями из памяти
+        """
+        if not self._state.adding and not kwargs.get('force_insert') and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name not in self.counter_fields]
+        super().save(*args, **kwargs)
+
+
 class School(models.Model):
     """
     Школа (Модель)
@@ -93,6 +157,7 @@ class User(AbstractUser):
     username = None
     email = models.EmailField('Email', unique=True)
     image = models.ImageField('Аватар пользователя', blank=True, validators=[image_validator])
+    image_derivatives = models.JSONField('Производные изображения', default=dict, blank=True, editable=False)
     name = models.CharField('Имя', max_length=256, default='', blank=True)
     surname = models.CharField('Фамилия', max_length=256, default='', blank=True)
     fathers_name = models.CharField('Отчество', max_length=256, default='', blank=True)
@@ -123,8 +188,21 @@ class User(AbstractUser):
     def __str__(self):
         return self.email
 
+    def refresh_from_db(self, using=None, fields=None):
+        """
+        Загрузка полей из базы данных
+
+        При обращении к отложенному полю загружаются сразу все отложенные поля
+        (пользователь из JWT содержит только поля токена)
+        """
+        if fields is not None:
+            deferred_fields = self.get_deferred_fields()
+            if deferred_fields and set(fields) <= deferred_fields:
+                fields = list(deferred_fields)
+        super().refresh_from_db(using, fields)
+
 
-class Organization(models.Model):
+class Organization(CountersModel):
     """
     Организация (Модель)
     """
@@ -138,6 +216,7 @@ class Organization(models.Model):
 
     name = models.CharField('Название организации', max_length=64)
     image = models.ImageField('Аватар организации', blank=True, validators=[image_validator])
+    image_derivatives = models.JSONField('Производные изображения', default=dict, blank=True, editable=False)
     description = models.TextField('Описание', default='', blank=True)
     mission = models.TextField('Миссия', default='', blank=True)
     motivation = models.TextField('Мотивировка', default='', blank=True)
@@ -153,12 +232,22 @@ class Organization(models.Model):
     status = models.CharField('Статус', max_length=20, choices=StatusChoices.choices,
                               default=StatusChoices.NEW)
 
+    members_count = models.PositiveIntegerField('Количество участников', default=0, editable=False)
+
+    search_vector = SearchVectorField('Поисковый вектор', null=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    counter_fields = ('members_count',)
+
     class Meta:
         verbose_name = 'Организация'
         verbose_name_plural = 'Организации'
+        indexes = [
+            models.Index(fields=['status'], name='organization_status_idx'),
+            models.Index(fields=['-created_at', '-id'], name='organization_created_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -194,6 +283,9 @@ class MembersInOrganization(models.Model):
         constraints = [
             models.UniqueConstraint(fields=['user', 'organization'], name='unique_member_in_organization')
         ]
+        indexes = [
+            models.Index(fields=['organization', 'role'], name='member_organization_role_idx'),
+        ]
 
 
 class EventCategory(models.Model):
@@ -224,7 +316,7 @@ class EventType(models.Model):
         return self.name
 
 
-class Event(models.Model):
+class Event(CountersModel):
     """
     Мероприятие (Модель)
     """
@@ -248,6 +340,7 @@ class Event(models.Model):
 
     name = models.CharField('Название мероприятия', max_length=64)
     image = models.ImageField('Картинка мероприятия', blank=True, validators=[image_validator])
+    image_derivatives = models.JSONField('Производные изображения', default=dict, blank=True, editable=False)
     organization = models.ForeignKey(Organization, verbose_name="Организатор мероприятия", on_delete=models.CASCADE)
     time = models.TimeField('Время проведения')
     auditorium = models.CharField('Место проведения/Аудитория', max_length=64)
@@ -257,7 +350,8 @@ class Event(models.Model):
     date_end = models.DateField('Дата окончания')
     level = models.CharField('Уровень мероприятия', max_length=64, choices=LevelChoices.choices,
                              default=LevelChoices.UNIVERSITY)
-    guests = models.ManyToManyField(User, verbose_name='Участники мероприятия', related_name='guests', blank=True)
+    guests = models.ManyToManyField(User, verbose_name='Участники мероприятия', through='EventGuests',
+                                    related_name='guests', blank=True)
 
     status = models.CharField('Статус', max_length=64, choices=StatusChoices.choices,
                               default=StatusChoices.NEW)
@@ -265,12 +359,29 @@ class Event(models.Model):
     event_category = models.ManyToManyField(EventCategory, verbose_name='Категории мероприятия',related_name='event_category',blank=True)
     event_type = models.ManyToManyField(EventType, verbose_name='Типы мероприятия',related_name='event_type',blank=True)
 
+    guests_count = models.PositiveIntegerField('Количество участников', default=0, editable=False)
+    organizers_count = models.PositiveIntegerField('Количество организаторов', default=0, editable=False)
+
+    search_vector = SearchVectorField('Поисковый вектор', null=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    counter_fields = ('guests_count', 'organizers_count')
+
     class Meta:
         verbose_name = 'Мероприятие'
         verbose_name_plural = 'Мероприятия'
+        indexes = [
+            models.Index(fields=['date'], name='event_date_idx'),
+            models.Index(fields=['status', 'date'], name='event_status_date_idx'),
+            models.Index(fields=['level', 'date'], name='event_level_date_idx'),
+            models.Index(fields=['organization', 'date'], name='event_organization_date_idx'),
+            models.Index(fields=['date_end'], name='event_date_end_idx'),
+            models.Index(fields=['date'], name='event_verified_date_idx',
+                         condition=models.Q(status='verify')),
+            models.Index(fields=['-created_at', '-id'], name='event_created_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -310,8 +421,9 @@ class EventGuests(models.Model):
     """
     Посетители мероприятия (Модель)
     """
-    user = models.ForeignKey(User, verbose_name='Участник', on_delete=models.CASCADE)
-    event = models.ForeignKey(Event, verbose_name='Мероприятие', on_delete=models.CASCADE)
+    # Отдельные индексы внешних ключей не нужны: их покрывают составные индексы ниже
+    user = models.ForeignKey(User, verbose_name='Участник', on_delete=models.CASCADE, db_index=False)
+    event = models.ForeignKey(Event, verbose_name='Мероприятие', on_delete=models.CASCADE, db_index=False)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -320,8 +432,12 @@ class EventGuests(models.Model):
         verbose_name = 'Гость мероприятия'
         verbose_name_plural = 'Гости мероприятий'
         constraints = [
+            # Уникальный индекс (user, event) обслуживает выборку мероприятий пользователя
             models.UniqueConstraint(fields=['user', 'event'], name='unique_guest_in_event')
         ]
+        indexes = [
+            models.Index(fields=['event', 'user'], name='event_guest_event_user_idx'),
+        ]
 
 
 class Notification(models.Model):
@@ -339,6 +455,11 @@ class Notification(models.Model):
     class Meta:
         verbose_name = 'Уведомление'
         verbose_name_plural = 'Уведомления'
+        indexes = [
+            models.Index(fields=['user', 'viewed', '-created_at'], name='notification_inbox_idx'),
+            models.Index(fields=['user', '-created_at'], name='notification_unviewed_idx',
+                         condition=models.Q(viewed=False)),
+        ]
 
 
 class Slide(models.Model):
@@ -347,6 +468,7 @@ class Slide(models.Model):
     """
     name = models.CharField('Название', max_length=100)
     img = models.ImageField('Изображение', max_length=100)
+    img_derivatives = models.JSONField('Производные изображения', default=dict, blank=True, editable=False)
     link = models.CharField('Ссылка', max_length=250)
 
     class Meta:
@@ -357,3 +479,48 @@ class Slide(models.Model):
         return self.name
 
 
+class OutgoingEmail(models.Model):
+    """
+    Исходящее письмо (Модель)
+    """
+    class StatusChoices(models.TextChoices):
+        """
+        Статус письма
+        """
+        PENDING = 'pending', 'В очереди'
+        SENDING = 'sending', 'Отправляется'
+        SENT = 'sent', 'Отправлено'
+        FAILED = 'failed', 'Не отправлено'
+
+    subject = models.TextField('Тема', blank=True)
+    body = models.TextField('Текст', blank=True)
+    from_email = models.CharField('Отправитель', max_length=256)
+    to = models.JSONField('Получатели', default=list)
+    cc = models.JSONField('Копия', default=list)
+    bcc = models.JSONField('Скрытая копия', default=list)
+    reply_to = models.JSONField('Адрес для ответа', default=list)
+    alternatives = models.JSONField('Альтернативные версии', default=list)
+    attachments = models.JSONField('Вложения', default=list)
+    content_subtype = models.CharField('Тип текста', max_length=32, default='plain')
+    headers = models.JSONField('Заголовки', default=dict)
+
+    status = models.CharField('Статус', max_length=20, choices=StatusChoices.choices,
+                              default=StatusChoices.PENDING)
+    attempts = models.PositiveIntegerField('Попытки отправки', default=0)
+    # Для отправляемого письма - окончание аренды, после которого его заберет другой обработчик
+    next_attempt_at = models.DateTimeField('Следующая попытка', default=timezone.now)
+    last_error = models.TextField('Последняя ошибка', default='', blank=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outgoing_email_queue_idx'),
+        ]
+
+    def __str__(self):
+        return self.subject
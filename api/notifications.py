@@ -0,0 +1,135 @@
+from functools import partial
+from itertools import islice
+
+from django.core.cache import cache
+from django.db import transaction
+
+from api.caching import shared_timeout
+from api.models import Notification, EventGuests, EventOrganizers, MembersInOrganization
+from api.realtime import get_broker, publish_notifications
+
+# Размер пачки при массовом создании уведомлений
+FAN_OUT_BATCH_SIZE = 1000
+
+# Время жизни счетчика непрочитанных уведомлений в кеше
+# Счетчик меняется из разных процессов, поэтому без SQL он отдается только из общего кеша (например, Redis);
+# в кеше в памяти процесса он живет не дольше LOCAL_CACHE_TIMEOUT
+UNREAD_COUNT_TIMEOUT = 60 * 60
+
+
+def _unread_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def get_unread_count(user_id):
+    """
+    Количество непрочитанных уведомлений пользователя из кеша
+    """
+    key = _unread_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, viewed=False).count()
+        cache.add(key, count, shared_timeout(UNREAD_COUNT_TIMEOUT))
+    return count
+
+
+def change_unread_count(user_id, delta):
+    """
+    Изменение закешированного счетчика непрочитанных уведомлений
+    """
+    try:
+        cache.incr(_unread_key(user_id), delta)
+    except ValueError:
+        # Счетчика нет в кеше, он будет посчитан при следующем запросе
+        pass
+
+
+def reset_unread_counts(user_ids):
+    """
+    Сброс закешированных счетчиков непрочитанных уведомлений
+    """
+    cache.delete_many([_unread_key(user_id) for user_id in user_ids])
+
+
+def mark_notifications_viewed(user_id, ids=None):
+    """
+    Отметка уведомлений пользователя прочитанными одним запросом UPDATE
+    """
+    queryset = Notification.objects.filter(user_id=user_id, viewed=False)
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+    updated = queryset.update(viewed=True)
+    if ids is None:
+        transaction.on_commit(lambda: cache.set(_unread_key(user_id), 0, shared_timeout(UNREAD_COUNT_TIMEOUT)))
+    elif updated:
+        transaction.on_commit(partial(change_unread_count, user_id, -updated))
+    return updated
+
+
+def event_recipient_ids(event_id):
+    """
+    id гостей и организаторов мероприятия без повторов
+    """
+    guests = EventGuests.objects.filter(event_id=event_id).values_list('user_id', flat=True)
+    organizers = EventOrganizers.objects.filter(event_id=event_id).values_list('user_id', flat=True)
+    return guests.union(organizers).iterator()
+
+
+def organization_recipient_ids(organization_id):
+    """
+    id членов организации
+    """
+    return (MembersInOrganization.objects
+            .filter(organization_id=organization_id)
+            .values_list('user_id', flat=True)
+            .iterator())
+
+
+def fan_out(user_ids, message, link, batch_size=FAN_OUT_BATCH_SIZE):
+    """
+    Создание одинаковых уведомлений для пользователей пачками через bulk_create
+
+    До фиксации транзакции в памяти остаются только id получателей,
+    уведомления для отправки подключенным пользователям выбираются из базы данных после фиксации
+    """
+    user_ids = iter(user_ids)
+    recipient_ids = set()
+    last_id = Notification.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    created = 0
+    with transaction.atomic():
+        while True:
+            batch = [Notification(user_id=user_id, message=message, link=link)
+                     for user_id in islice(user_ids, batch_size)]
+            if not batch:
+                break
+            Notification.objects.bulk_create(batch)
+            recipient_ids.update(notification.user_id for notification in batch)
+            created += len(batch)
+        transaction.on_commit(partial(reset_unread_counts, recipient_ids))
+        transaction.on_commit(partial(publish_fan_out, recipient_ids, message, link, last_id, batch_size))
+    return created
+
+
+def publish_fan_out(user_ids, message, link, after_id, batch_size=FAN_OUT_BATCH_SIZE):
+    """
+    Отправка уведомлений, созданных fan_out после уведомления after_id, подключенным пользователям пачками
+    """
+    broker = get_broker()
+    user_ids = [user_id for user_id in user_ids if broker.has_subscribers(user_id)]
+    for start in range(0, len(user_ids), batch_size):
+        publish_notifications(Notification.objects.filter(id__gt=after_id, message=message, link=link,
+                                                          user_id__in=user_ids[start:start + batch_size]))
+
+
+def notify_event(event_id, message, link, batch_size=FAN_OUT_BATCH_SIZE):
+    """
+    Уведомление гостей и организаторов мероприятия
+    """
+    return fan_out(event_recipient_ids(event_id), message, link, batch_size)
+
+
+def notify_organization(organization_id, message, link, batch_size=FAN_OUT_BATCH_SIZE):
+    """
+    Уведомление членов организации
+    """
+    return fan_out(organization_recipient_ids(organization_id), message, link, batch_size)
@@ -0,0 +1,33 @@
+from rest_framework.pagination import CursorPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация по (created_at, id)
+
+    Для моделей без created_at используется сортировка по id.
+    Параметр ?unpaginated=true возвращает весь список без пагинации
+    """
+    ordering = ('-created_at', '-id')
+    fallback_ordering = ('-id',)
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    unpaginated_query_param = 'unpaginated'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Пагинация набора данных
+        """
+        if request.query_params.get(self.unpaginated_query_param, '').lower() in ('1', 'true'):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Получение сортировки
+        """
+        ordering = super().get_ordering(request, queryset, view)
+        field_names = {field.name for field in queryset.model._meta.concrete_fields}
+        if ordering[0].lstrip('-') not in field_names:
+            ordering = self.fallback_ordering
+        return ordering
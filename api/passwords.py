@@ -0,0 +1,57 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connections
+
+# Количество паролей, передаваемых процессу пула за один раз
+HASH_CHUNK_SIZE = 16
+
+
+def password_hash_workers():
+    """
+    Количество процессов хеширования паролей
+    """
+    return getattr(settings, 'PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 1
+
+
+def _init_worker():
+    """
+    Настройка Django в процессе пула (нужна при запуске процессов через spawn)
+    """
+    django.setup()
+
+
+class PasswordHashPool:
+    """
+    Пул процессов для хеширования паролей (Контекстный менеджер)
+
+    Хеширование нагружает процессор, поэтому выполняется в отдельных процессах;
+    при workers <= 1 пароли хешируются в текущем процессе
+    """
+    def __init__(self, workers=None):
+        self.workers = password_hash_workers() if workers is None else workers
+        self._executor = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            # Открытые соединения с базой данных не должны наследоваться дочерними процессами
+            connections.close_all()
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def hash(self, passwords):
+        """
+        Хеши паролей в исходном порядке (None - непригодный для входа пароль)
+        """
+        passwords = list(passwords)
+        if self._executor is None or len(passwords) < 2:
+            return [make_password(password) for password in passwords]
+        return list(self._executor.map(make_password, passwords, chunksize=HASH_CHUNK_SIZE))
@@ -1,9 +1,8 @@
 from django.contrib.auth.models import AnonymousUser
 from rest_framework.permissions import BasePermission
 
-from api.models import Organization, MembersInOrganization, EventOrganizers, Event
-
-
+from api.models import Organization, MembersInOrganization, Event
+from api.roles import get_user_roles
 
 
 class IsOwnerOrAdmin(BasePermission):
@@ -29,33 +28,24 @@ class IsLeaderOrAdmin(BasePermission):
         user = request.user
         if type(user) == AnonymousUser:
             return False
+        roles = get_user_roles(request)
         if type(obj) in [Organization, MembersInOrganization]:
             if type(obj) == Organization:
-                obj_id = obj.id
+                org_id = obj.id
             else:
-                obj_id = obj.organization_id
-            leader_table = (MembersInOrganization.objects.all()
-                                      .filter(user=user)
-                                      .filter(organization_id=obj_id))
+                org_id = obj.organization_id
+            is_leader = roles.is_organization_leader(org_id)
         else:
             if type(obj) == Event:
                 event_id = obj.id
-                org_id = obj.organization.id
+                org_id = obj.organization_id
             else:
-                event_id = obj.id
-                org_id = obj.event.organization.id
-            leader_table_event = (EventOrganizers.objects.all()
-                                      .filter(user=user)
-                                      .filter(event_id=event_id))
-            leader_table_org =(MembersInOrganization.objects.all()
-                                      .filter(user=user)
-                                      .filter(organization_id=org_id))
-            leader_table = leader_table_event if leader_table_event.count() else leader_table_org
-
-        if leader_table.count() and leader_table[0].role in ['leader', 'admin']:
-            is_leader = True
-        else:
-            is_leader = False
+                event_id = obj.event_id
+                org_id = obj.event.organization_id
+            if roles.event_role(event_id) is not None:
+                is_leader = roles.is_event_leader(event_id)
+            else:
+                is_leader = roles.is_organization_leader(org_id)
         is_admin = bool(request.user and request.user.is_staff)
 
         return is_leader or is_admin
@@ -68,13 +58,7 @@ class IsOrganizationMemberOrAdmin(BasePermission):
         if type(user) == AnonymousUser:
             return False
 
-        user_intermediate_rows = MembersInOrganization.objects.all().filter(user=request.user)
-
-        if user_intermediate_rows:
-            is_member = True
-        else:
-            is_member = False
-
+        is_member = get_user_roles(request).is_member()
         is_admin = bool(request.user and request.user.is_staff)
 
         return is_member or is_admin
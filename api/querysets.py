@@ -0,0 +1,96 @@
+from django.db.models import ForeignObjectRel
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField, PrimaryKeyRelatedField
+
+
+def _get_model_field(model, attr):
+    """
+    Получение поля модели по имени атрибута (включая обратные связи вида *_set)
+    """
+    for field in model._meta.get_fields():
+        if isinstance(field, ForeignObjectRel):
+            name = field.get_accessor_name()
+        else:
+            name = field.name
+        if name == attr:
+            return field
+    return None
+
+
+def _resolve_source(model, source_attrs):
+    """
+    Разбор source поля сериализатора по связям модели
+
+    Возвращает конечную модель и признак связи "ко многим" или None,
+    если source не является цепочкой связей
+    """
+    many = False
+    for attr in source_attrs:
+        model_field = _get_model_field(model, attr)
+        if model_field is None or not model_field.is_relation:
+            return None
+        many = many or model_field.many_to_many or model_field.one_to_many
+        model = model_field.related_model
+    return model, many
+
+
+def _collect_lookups(serializer, model, prefix, in_prefetch, select_related, prefetch_related):
+    """
+    Рекурсивный обход полей сериализатора
+    """
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        if isinstance(field, serializers.ListSerializer):
+            child = field.child
+        elif isinstance(field, ManyRelatedField):
+            child = field.child_relation
+        elif isinstance(field, (serializers.BaseSerializer, RelatedField)):
+            child = field
+        else:
+            continue
+
+        resolved = _resolve_source(model, field.source_attrs)
+        if resolved is None:
+            continue
+        related_model, many = resolved
+
+        path = list(field.source_attrs)
+        if not many and isinstance(child, PrimaryKeyRelatedField):
+            # Значение внешнего ключа уже есть в строке родителя
+            path = path[:-1]
+            if not path:
+                continue
+
+        lookup = prefix + '__'.join(path)
+        nested_prefetch = in_prefetch or many
+        if nested_prefetch:
+            prefetch_related.append(lookup)
+        else:
+            select_related.append(lookup)
+
+        if isinstance(child, serializers.BaseSerializer):
+            _collect_lookups(child, related_model, lookup + '__', nested_prefetch,
+                             select_related, prefetch_related)
+
+
+def get_related_lookups(serializer, model):
+    """
+    Получение списков select_related и prefetch_related по объявленным полям сериализатора
+    """
+    select_related = []
+    prefetch_related = []
+    _collect_lookups(serializer, model, '', False, select_related, prefetch_related)
+    return list(dict.fromkeys(select_related)), list(dict.fromkeys(prefetch_related))
+
+
+def optimize_queryset(queryset, serializer):
+    """
+    Добавление select_related/prefetch_related в набор данных для сериализатора
+    """
+    select_related, prefetch_related = get_related_lookups(serializer, queryset.model)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
@@ -0,0 +1,200 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import TokenClaimsAuthentication
+
+# Интервал отправки комментариев keep-alive в открытый поток, в секундах
+KEEPALIVE_INTERVAL = getattr(settings, 'NOTIFICATION_STREAM_KEEPALIVE', 15)
+
+# Максимальное число неотправленных событий на одно подключение
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+
+class BaseBroker:
+    """
+    Брокер событий уведомлений (Интерфейс)
+
+    subscribe/unsubscribe вызываются в цикле событий ASGI приложения,
+    publish может вызываться из любого потока
+    """
+    def subscribe(self, user_id):
+        """
+        Подписка на события пользователя, возвращает asyncio.Queue
+        """
+        raise NotImplementedError
+
+    def unsubscribe(self, user_id, queue):
+        """
+        Отписка от событий пользователя
+        """
+        raise NotImplementedError
+
+    def publish(self, user_id, payload):
+        """
+        Публикация события пользователю
+        """
+        raise NotImplementedError
+
+    def has_subscribers(self, user_id):
+        """
+        Есть ли подписчики у пользователя (без подписчиков событие не сериализуется)
+
+        Брокер, подписчики которого находятся в других процессах, должен возвращать True
+        """
+        return True
+
+
+def _put_latest(queue, payload):
+    """
+    Добавление события в очередь, при переполнении отбрасывается самое старое
+    """
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(payload)
+
+
+class InProcessBroker(BaseBroker):
+    """
+    Брокер событий в памяти процесса
+    """
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id):
+        queue = asyncio.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers[user_id].add((asyncio.get_event_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, set())
+            subscribers.difference_update({item for item in subscribers if item[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def publish(self, user_id, payload):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(_put_latest, queue, payload)
+
+    def has_subscribers(self, user_id):
+        return user_id in self._subscribers
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """
+    Брокер событий из настройки NOTIFICATION_BROKER
+    """
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                broker_class = getattr(settings, 'NOTIFICATION_BROKER', 'api.realtime.InProcessBroker')
+                _broker = import_string(broker_class)()
+    return _broker
+
+
+def publish_notifications(notifications):
+    """
+    Отправка уведомлений подключенным пользователям
+
+    Уведомления пользователей без подписчиков не сериализуются
+    """
+    from api.serializers.notification_serializer import NotificationAdminSerializer
+
+    broker = get_broker()
+    for notification in notifications:
+        if broker.has_subscribers(notification.user_id):
+            broker.publish(notification.user_id, NotificationAdminSerializer(notification).data)
+
+
+def _get_token(scope):
+    """
+    Получение JWT из заголовка Authorization или параметра token
+    """
+    for name, value in scope.get('headers', []):
+        if name == b'authorization':
+            parts = value.decode('latin1').split()
+            if len(parts) == 2 and parts[0] in jwt_settings.AUTH_HEADER_TYPES:
+                return parts[1]
+    token = parse_qs(scope.get('query_string', b'').decode('latin1')).get('token')
+    return token[0] if token else None
+
+
+def authenticate_scope(scope):
+    """
+    id активного пользователя из JWT подключения или None
+
+    Пользователь восстанавливается из утверждений токена, к базе данных
+    обращение идет только для старых токенов и после изменения прав
+    """
+    raw_token = _get_token(scope)
+    if raw_token is None:
+        return None
+    try:
+        user = TokenClaimsAuthentication().get_user(AccessToken(raw_token))
+    except (TokenError, AuthenticationFailed):
+        return None
+    return user.pk
+
+
+async def _wait_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+async def notification_stream(scope, receive, send):
+    """
+    Поток новых уведомлений пользователя (Server-Sent Events, ASGI приложение)
+    """
+    user_id = await sync_to_async(authenticate_scope)(scope)
+    if user_id is None:
+        await send({'type': 'http.response.start', 'status': 401,
+                    'headers': [(b'content-type', b'application/json')]})
+        await send({'type': 'http.response.body',
+                    'body': json.dumps({'detail': 'Учетные данные не были предоставлены.'}).encode()})
+        return
+
+    broker = get_broker()
+    queue = broker.subscribe(user_id)
+    disconnect = asyncio.ensure_future(_wait_disconnect(receive))
+    try:
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type', b'text/event-stream'),
+                                (b'cache-control', b'no-cache'),
+                                (b'x-accel-buffering', b'no')]})
+        while not disconnect.done():
+            next_event = asyncio.ensure_future(queue.get())
+            done, pending = await asyncio.wait({next_event, disconnect}, timeout=KEEPALIVE_INTERVAL,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            if next_event in done:
+                body = f'event: notification\ndata: {json.dumps(next_event.result())}\n\n'.encode()
+            else:
+                next_event.cancel()
+                if disconnect in done:
+                    break
+                body = b': keep-alive\n\n'
+            await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+    finally:
+        disconnect.cancel()
+        broker.unsubscribe(user_id, queue)
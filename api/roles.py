@@ -0,0 +1,158 @@
+import threading
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from api.caching import get_version, bump_version, shared_timeout
+from api.models import MembersInOrganization, EventOrganizers
+
+ORGANIZATION_LEADER_ROLES = ('leader', 'admin')
+EVENT_LEADER_ROLES = ('leader',)
+
+# Версия формата записей в кеше, увеличивается при изменении структуры UserRoles
+ROLE_CACHE_FORMAT = 1
+
+# Поколение ролей процесса, увеличивается сигналами при изменении любого членства.
+# Одно число вместо счетчика на пользователя: роли, загруженные в запросе, перечитываются
+# из кеша после любого сброса, а память не растет с количеством пользователей
+_generation = 0
+
+# Счетчики попаданий и промахов кеша ролей в этом процессе
+_stats = {'hits': 0, 'misses': 0}
+
+# Блокировка изменения поколения и счетчиков из потоков запросов
+_lock = threading.Lock()
+
+
+def _count(name):
+    with _lock:
+        _stats[name] += 1
+
+
+class UserRoles:
+    """
+    Роли пользователя в организациях и мероприятиях
+    """
+    def __init__(self, organizations, events):
+        self.organizations = organizations
+        self.events = events
+
+    def organization_role(self, organization_id):
+        """
+        Роль в организации
+        """
+        return self.organizations.get(organization_id)
+
+    def event_role(self, event_id):
+        """
+        Роль в мероприятии
+        """
+        return self.events.get(event_id)
+
+    def is_member(self):
+        """
+        Состоит ли пользователь хотя бы в одной организации
+        """
+        return bool(self.organizations)
+
+    def is_organization_leader(self, organization_id):
+        """
+        Является ли пользователь руководителем/администратором организации
+        """
+        return self.organization_role(organization_id) in ORGANIZATION_LEADER_ROLES
+
+    def is_event_leader(self, event_id):
+        """
+        Является ли пользователь руководителем мероприятия
+        """
+        return self.event_role(event_id) in EVENT_LEADER_ROLES
+
+    def leader_organization_ids(self):
+        """
+        id организаций, где пользователь руководитель/администратор
+        """
+        return [org_id for org_id, role in self.organizations.items() if role in ORGANIZATION_LEADER_ROLES]
+
+    def leader_event_ids(self):
+        """
+        id мероприятий, где пользователь руководитель
+        """
+        return [event_id for event_id, role in self.events.items() if role in EVENT_LEADER_ROLES]
+
+
+def load_user_roles(user_id):
+    """
+    Загрузка ролей пользователя из базы данных
+    """
+    organizations = dict(MembersInOrganization.objects
+                         .filter(user_id=user_id)
+                         .values_list('organization_id', 'role'))
+    events = dict(EventOrganizers.objects
+                  .filter(user_id=user_id)
+                  .values_list('event_id', 'role'))
+    return UserRoles(organizations, events)
+
+
+def _cache_alias():
+    return getattr(settings, 'ROLE_CACHE_ALIAS', 'default')
+
+
+def _version_key(user_id):
+    return f'roles:version:{user_id}'
+
+
+def _roles_key(user_id, version):
+    return f'roles:{ROLE_CACHE_FORMAT}:{user_id}:{version}'
+
+
+def get_cached_user_roles(user_id):
+    """
+    Роли пользователя из кеша, при промахе загружаются из базы данных
+    """
+    cache = caches[_cache_alias()]
+    key = _roles_key(user_id, get_version(_version_key(user_id), _cache_alias()))
+    cached = cache.get(key)
+    if cached is not None:
+        _count('hits')
+        return UserRoles(*cached)
+    _count('misses')
+    roles = load_user_roles(user_id)
+    cache.set(key, (roles.organizations, roles.events),
+              shared_timeout(getattr(settings, 'ROLE_CACHE_TIMEOUT', 86400), _cache_alias()))
+    return roles
+
+
+def role_cache_stats():
+    """
+    Счетчики попаданий и промахов кеша ролей в этом процессе
+    """
+    with _lock:
+        return dict(_stats)
+
+
+def get_user_roles(request):
+    """
+    Роли текущего пользователя, загружаются один раз за запрос
+    """
+    user_id = request.user.id
+    generation = _generation
+    cached = getattr(request, '_user_roles', None)
+    if cached is None or cached[:2] != (user_id, generation):
+        cached = (user_id, generation, get_cached_user_roles(user_id))
+        request._user_roles = cached
+    return cached[2]
+
+
+def invalidate_user_roles(user_id):
+    """
+    Сброс закешированных ролей пользователя
+
+    Версия в кеше увеличивается после фиксации транзакции, иначе параллельный запрос
+    мог бы закешировать роли до сохранения изменений
+    """
+    global _generation
+    with _lock:
+        _generation += 1
+    transaction.on_commit(partial(bump_version, _version_key(user_id), _cache_alias()))
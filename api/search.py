@@ -0,0 +1,65 @@
+from functools import reduce
+from operator import and_, or_
+
+from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, Q
+
+from api.models import Event, Organization
+
+# Конфигурация полнотекстового поиска PostgreSQL (стемминг русского языка)
+SEARCH_CONFIG = 'russian'
+
+# Поля поиска и их веса (при изменении нужна миграция, пересчитывающая векторы)
+SEARCH_FIELDS = {
+    Event: (('name', 'A'), ('auditorium', 'B')),
+    Organization: (('name', 'A'), ('description', 'B'), ('mission', 'C'), ('goal', 'C')),
+}
+
+def is_full_text_supported():
+    """
+    Поддерживает ли база данных полнотекстовый поиск
+    """
+    return connection.vendor == 'postgresql'
+
+
+def search_vector(model):
+    """
+    Выражение поискового вектора модели
+    """
+    vectors = [SearchVector(field, weight=weight, config=SEARCH_CONFIG)
+               for field, weight in SEARCH_FIELDS[model]]
+    return reduce(lambda left, right: left + right, vectors)
+
+
+def update_search_vectors(queryset):
+    """
+    Пересчет сохраненных поисковых векторов
+    """
+    if not is_full_text_supported():
+        return 0
+    return queryset.update(search_vector=search_vector(queryset.model))
+
+
+def search(queryset, query):
+    """
+    Поиск по набору данных
+
+    В PostgreSQL используется сохраненный tsvector с ранжированием,
+    в остальных базах данных - поиск подстрок (LIKE) по всем словам запроса
+    """
+    if is_full_text_supported():
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+        return (queryset
+                .filter(search_vector=search_query)
+                .annotate(rank=SearchRank(F('search_vector'), search_query))
+                .order_by('-rank', '-id'))
+
+    fields = [field for field, weight in SEARCH_FIELDS[queryset.model]]
+    terms = query.split()
+    if not terms:
+        return queryset.none()
+    conditions = [reduce(or_, [Q(**{f'{field}__icontains': term}) for field in fields])
+                  for term in terms]
+    return queryset.filter(reduce(and_, conditions)).order_by('-id')
+
@@ -0,0 +1,36 @@
+from rest_framework import serializers
+
+from api.bulk import bulk_max_rows
+from api.models import EventOrganizers
+
+
+class BulkRowsSerializer(serializers.Serializer):
+    """
+    Строки массовой операции (Сериализатор)
+    """
+    rows = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+
+    def validate_rows(self, rows):
+        """
+        Проверка количества строк
+        """
+        if len(rows) > bulk_max_rows():
+            raise serializers.ValidationError(f'Не более {bulk_max_rows()} строк за один запрос')
+        return rows
+
+
+class EventGuestsBulkRowSerializer(serializers.Serializer):
+    """
+    Строка массовой регистрации гостей мероприятий (Сериализатор)
+    """
+    event = serializers.IntegerField(min_value=1)
+    user = serializers.IntegerField(min_value=1, required=False)
+
+
+class EventOrganizersBulkRowSerializer(serializers.Serializer):
+    """
+    Строка массового назначения организаторов мероприятий (Сериализатор)
+    """
+    event = serializers.IntegerField(min_value=1)
+    user = serializers.IntegerField(min_value=1)
+    role = serializers.ChoiceField(choices=EventOrganizers.RoleChoices.choices, required=False)
@@ -1,9 +1,10 @@
 from rest_framework import serializers
 
 from api.models import EventGuests
+from api.serializers.mixins import DynamicFieldsMixin
 
 
-class EventGuestsAdminSerializer(serializers.ModelSerializer):
+class EventGuestsAdminSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Посетители мероприятия для администратора (Сериализатор)
     """
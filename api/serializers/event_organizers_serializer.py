@@ -2,6 +2,8 @@ from rest_framework import serializers
 from rest_framework.exceptions import APIException
 
 from api.models import EventOrganizers, MembersInOrganization
+from api.roles import get_user_roles
+from api.serializers.mixins import DynamicFieldsMixin
 
 
 class EventOrganizersDeapSerializer(serializers.ModelSerializer):
@@ -13,7 +15,7 @@ class EventOrganizersDeapSerializer(serializers.ModelSerializer):
         fields = ('user', 'role')
 
 
-class EventOrganizersAdminSerializer(serializers.ModelSerializer):
+class EventOrganizersAdminSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Организаторы мероприятия для администратора (Сериализатор)
     """
@@ -28,18 +30,8 @@ class EventOrganizersAdminSerializer(serializers.ModelSerializer):
         """
         Получение id организаций и мероприятий лидера
         """
-        leader_events = []
-        leader_orgs = []
-
-        event_rows = EventOrganizers.objects.all().filter(user_id=self._user().id)
-        orgs_rows = MembersInOrganization.objects.all().filter(user_id=self._user().id)
-        for row in event_rows:
-            if row.role in ['leader']:
-                leader_events.append(row.event_id)
-        for row in orgs_rows:
-            if row.role in ['leader', 'admin']:
-                leader_orgs.append(row.organization_id)
-        return leader_events, leader_orgs
+        roles = get_user_roles(self.context['request'])
+        return roles.leader_event_ids(), roles.leader_organization_ids()
 
     class Meta:
         model = EventOrganizers
@@ -55,8 +47,9 @@ class EventOrganizersSerializer(EventOrganizersAdminSerializer):
         """
         Создание организатора мероприятия
         """
-        if (validated_data['event'].id not in self._leader_ids()[0] and
-                validated_data['event'].organization.id not in self._leader_ids()[1]):
+        leader_events, leader_orgs = self._leader_ids()
+        if (validated_data['event'].id not in leader_events and
+                validated_data['event'].organization_id not in leader_orgs):
             raise APIException("Вы не являетесь руководителем этого мероприятия")
         event_organizer = EventOrganizers.objects.create(**validated_data)
         return event_organizer
@@ -65,8 +58,9 @@ class EventOrganizersSerializer(EventOrganizersAdminSerializer):
         """
         Обновление организатора мероприятия
         """
-        if (validated_data['event'].id not in self._leader_ids()[0] and
-                validated_data['event'].organization.id not in self._leader_ids()[1]):
+        leader_events, leader_orgs = self._leader_ids()
+        if (validated_data['event'].id not in leader_events and
+                validated_data['event'].organization_id not in leader_orgs):
 
             raise APIException("Вы не являетесь руководителем этого мероприятия")
         instance.role = validated_data.get('role', instance.role)
@@ -1,11 +1,13 @@
 from rest_framework import serializers
 
 from api.models import EventOrganizers, Event
+from api.serializers.fields import ImageSrcsetField
+from api.serializers.mixins import DynamicFieldsMixin
 from api.serializers.event_guests_serializer import EventGuestsSerializer
 from api.serializers.event_organizers_serializer import EventOrganizersDeapSerializer
 
 
-class EventAdminSerializer(serializers.ModelSerializer):
+class EventAdminSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Мероприятие для администратора (Сериализатор)
     """
@@ -13,6 +15,7 @@ class EventAdminSerializer(serializers.ModelSerializer):
                                            source='eventorganizers_set')
     guests = EventGuestsSerializer(many=True, read_only=True,
                                    source='eventguests_set')
+    image_srcset = ImageSrcsetField(source='image')
 
     def _user(self):
         """
@@ -23,8 +26,18 @@ class EventAdminSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Event
-        fields = '__all__'
+        exclude = ('search_vector', 'image_derivatives')
         read_only_fields = ('id', 'created_at', 'updated_at', 'organizers', 'guests')
+        expandable_fields = ('organizers', 'guests')
+
+
+class EventListSerializer(EventAdminSerializer):
+    """
+    Мероприятие для списков, с количеством участников и организаторов вместо вложенных списков,
+    которые выводятся только по ?expand= (Сериализатор)
+    """
+    class Meta(EventAdminSerializer.Meta):
+        expand_by_default = False
 
 
 class EventSerializer(EventAdminSerializer):
@@ -50,4 +63,5 @@ class EventSerializer(EventAdminSerializer):
             user_id=user.id,
             role='leader',
             event=event)
+        event.refresh_from_db(fields=Event.counter_fields)
         return event
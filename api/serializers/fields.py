@@ -0,0 +1,13 @@
+from rest_framework import serializers
+
+from api.images import image_srcset
+
+
+class ImageSrcsetField(serializers.ReadOnlyField):
+    """
+    Ссылки на оригинал и производные изображения (Поле сериализатора)
+    """
+    def to_representation(self, value):
+        request = self.context.get('request')
+        build_url = request.build_absolute_uri if request is not None else None
+        return image_srcset(value, build_url)
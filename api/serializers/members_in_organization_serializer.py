@@ -4,6 +4,8 @@ from rest_framework import serializers
 from rest_framework.exceptions import APIException
 
 from api.models import MembersInOrganization
+from api.roles import get_user_roles
+from api.serializers.mixins import DynamicFieldsMixin
 
 
 class MembersInOrganizationDeapSerializer(serializers.ModelSerializer):
@@ -15,7 +17,7 @@ class MembersInOrganizationDeapSerializer(serializers.ModelSerializer):
         fields = ('user', 'role')
 
 
-class MembersInOrganizationAdminSerializer(serializers.ModelSerializer):
+class MembersInOrganizationAdminSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Члены организации для администратора (Сериализатор)
     """
@@ -30,12 +32,7 @@ class MembersInOrganizationAdminSerializer(serializers.ModelSerializer):
         """
         Получение id организаций лидера
         """
-        leader_organizations = []
-        member_rows = MembersInOrganization.objects.all().filter(user_id=self._user().id)
-        for row in member_rows:
-            if row.role in ['leader', 'admin']:
-                leader_organizations.append(row.organization_id)
-        return leader_organizations
+        return get_user_roles(self.context['request']).leader_organization_ids()
 
     class Meta:
         model = MembersInOrganization
@@ -0,0 +1,54 @@
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+class DynamicFieldsMixin:
+    """
+    Выбор полей параметром ?fields= и раскрытие вложенных связей параметром ?expand= (Примесь сериализатора)
+
+    Вложенные связи из Meta.expandable_fields выводятся без параметров fields и expand (как раньше),
+    а при любом из параметров - только если указаны в expand или fields, тогда остальные связи
+    не сериализуются и не попадают в prefetch_related набора данных.
+    Meta.expand_by_default = False скрывает связи и без параметров (для списков)
+    """
+    fields_param = 'fields'
+    expand_param = 'expand'
+
+    def _is_root(self):
+        """
+        Является ли сериализатор корневым (в том числе элементом корневого списка)
+        """
+        parent = self.parent
+        return parent is None or (isinstance(parent, serializers.ListSerializer) and parent.parent is None)
+
+    def _query_names(self, param):
+        """
+        Имена полей из параметра запроса или None, если параметр не передан
+        """
+        request = self.context.get('request')
+        if request is None or param not in request.query_params:
+            return None
+        return {name.strip() for name in request.query_params[param].split(',') if name.strip()}
+
+    def get_fields(self):
+        """
+        Поля сериализатора с учетом параметров fields и expand
+        """
+        fields = super().get_fields()
+        request = self.context.get('request')
+        if request is None or request.method not in SAFE_METHODS or not self._is_root():
+            return fields
+
+        requested = self._query_names(self.fields_param)
+        expanded = self._query_names(self.expand_param)
+        if requested is None and expanded is None and getattr(self.Meta, 'expand_by_default', True):
+            return fields
+        expanded = expanded or set()
+        for name in getattr(self.Meta, 'expandable_fields', ()):
+            if name not in expanded and (requested is None or name not in requested):
+                fields.pop(name, None)
+        if requested is not None:
+            for name in list(fields):
+                if name not in requested and name not in expanded:
+                    fields.pop(name)
+        return fields
@@ -1,9 +1,10 @@
 from rest_framework import serializers
 
-from api.models import Notification
+from api.models import Notification, Event, Organization
+from api.serializers.mixins import DynamicFieldsMixin
 
 
-class NotificationAdminSerializer(serializers.ModelSerializer):
+class NotificationAdminSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Уведомление для администратора (Сериализатор)
     """
@@ -13,7 +14,7 @@ class NotificationAdminSerializer(serializers.ModelSerializer):
         read_only_fields = ('id','created_at','updated_at')
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Уведомление для пользователей (Сериализатор)
     """
@@ -21,3 +22,28 @@ class NotificationSerializer(serializers.ModelSerializer):
         model = Notification
         fields = '__all__'
         read_only_fields = ('user_id','message','link','id','created_at','updated_at')
+
+
+class NotificationFanOutSerializer(serializers.Serializer):
+    """
+    Массовая рассылка уведомлений (Сериализатор)
+    """
+    event = serializers.PrimaryKeyRelatedField(queryset=Event.objects.all(), required=False)
+    organization = serializers.PrimaryKeyRelatedField(queryset=Organization.objects.all(), required=False)
+    message = serializers.CharField()
+    link = serializers.CharField(max_length=250)
+
+    def validate(self, attrs):
+        """
+        Проверка, что указано ровно одно из полей event и organization
+        """
+        if ('event' in attrs) == ('organization' in attrs):
+            raise serializers.ValidationError('Укажите мероприятие или организацию')
+        return attrs
+
+
+class NotificationIdsSerializer(serializers.Serializer):
+    """
+    Список id уведомлений (Сериализатор)
+    """
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
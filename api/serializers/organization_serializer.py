@@ -1,15 +1,18 @@
 from rest_framework import serializers
 
 from api.models import MembersInOrganization, Organization
+from api.serializers.fields import ImageSrcsetField
+from api.serializers.mixins import DynamicFieldsMixin
 from api.serializers.members_in_organization_serializer import MembersInOrganizationDeapSerializer
 
 
-class OrganizationAdminSerializer(serializers.ModelSerializer):
+class OrganizationAdminSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Организация для администратора (Сериализатор)
     """
     members = MembersInOrganizationDeapSerializer(
         many=True, read_only=True,source='membersinorganization_set')
+    image_srcset = ImageSrcsetField(source='image')
 
     def _user(self):
         """
@@ -20,8 +23,18 @@ class OrganizationAdminSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Organization
-        fields = '__all__'
+        exclude = ('search_vector', 'image_derivatives')
         read_only_fields = ('id','created_at','updated_at','members')
+        expandable_fields = ('members',)
+
+
+class OrganizationListSerializer(OrganizationAdminSerializer):
+    """
+    Организация для списков, с количеством членов вместо вложенного списка,
+    который выводится только по ?expand= (Сериализатор)
+    """
+    class Meta(OrganizationAdminSerializer.Meta):
+        expand_by_default = False
 
 
 class OrganizationSerializer(OrganizationAdminSerializer):
@@ -41,4 +54,5 @@ class OrganizationSerializer(OrganizationAdminSerializer):
             user_id=user.id,
             role='leader'
         )
+        organization.refresh_from_db(fields=Organization.counter_fields)
         return organization
@@ -1,9 +1,11 @@
 from rest_framework import serializers
 
 from api.models import EventType, EventCategory, Slide, Faculty, School
+from api.serializers.fields import ImageSrcsetField
+from api.serializers.mixins import DynamicFieldsMixin
 
 
-class EventTypeSerializer(serializers.ModelSerializer):
+class EventTypeSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Тип мероприятия (Сериализатор)
     """
@@ -13,7 +15,7 @@ class EventTypeSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class EventCategorySerializer(serializers.ModelSerializer):
+class EventCategorySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Категория мероприятия (Сериализатор)
     """
@@ -23,17 +25,19 @@ class EventCategorySerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class SlideSerializer(serializers.ModelSerializer):
+class SlideSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Слайд (Сериализатор)
     """
+    img_srcset = ImageSrcsetField(source='img')
+
     class Meta:
         model = Slide
-        fields = '__all__'
+        exclude = ('img_derivatives',)
         read_only_fields = ('id',)
 
 
-class SchoolSerializer(serializers.ModelSerializer):
+class SchoolSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Школа (Сериализатор)
     """
@@ -43,7 +47,7 @@ class SchoolSerializer(serializers.ModelSerializer):
         read_only_fields = ('id',)
 
 
-class FacultySerializer(serializers.ModelSerializer):
+class FacultySerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Факультет (Сериализатор)
     """
@@ -0,0 +1,15 @@
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from api.authentication import add_user_claims
+
+
+class TokenObtainPairWithClaimsSerializer(TokenObtainPairSerializer):
+    """
+    Получение пары JWT с полями пользователя и их версией (Сериализатор)
+    """
+    @classmethod
+    def get_token(cls, user):
+        """
+        Токен обновления, утверждения которого копируются в токен доступа
+        """
+        return add_user_claims(super().get_token(user), user)
@@ -1,17 +1,20 @@
 from rest_framework import serializers
 
 from api.models import User
+from api.serializers.fields import ImageSrcsetField
+from api.serializers.mixins import DynamicFieldsMixin
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     """
     Пользователь (Сериализатор)
     """
     email = serializers.EmailField(read_only=True)
+    image_srcset = ImageSrcsetField(source='image')
 
     class Meta:
         model = User
-        fields = ('id', 'email', 'image', 'name','surname',
+        fields = ('id', 'email', 'image', 'image_srcset', 'name','surname',
                   'fathers_name', 'education_level','school',
                   'faculty', 'education_year','email_notification',
                   'phone', 'social_1', 'social_2', 'social_3')
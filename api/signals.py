@@ -0,0 +1,253 @@
+import threading
+from contextlib import contextmanager
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, post_init, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+
+from api.authentication import set_auth_version, delete_auth_version
+from api.caching import bump_table_version
+from api.counters import COUNTERS, change_counter, recount
+from api.images import IMAGE_FIELDS, derivatives_field_name, delete_model_derivatives
+from api.models import MembersInOrganization, EventOrganizers, EventGuests, Event, Organization, Notification, User, \
+    Slide, EventCategory, EventType, School, Faculty
+from api.notifications import change_unread_count
+from api.realtime import publish_notifications
+from api.roles import invalidate_user_roles
+from api.search import update_search_vectors
+
+# Справочники, ответы которых кешируются по версии таблицы
+REFERENCE_MODELS = (EventCategory, EventType, School, Faculty, Slide)
+
+
+def bump_reference_version(sender, **kwargs):
+    """
+    Увеличение версии таблицы справочника после фиксации изменений
+    """
+    transaction.on_commit(lambda: bump_table_version(sender))
+
+
+for reference_model in REFERENCE_MODELS:
+    post_save.connect(bump_reference_version, sender=reference_model)
+    post_delete.connect(bump_reference_version, sender=reference_model)
+
+
+# Признак пропуска обработки строк членства в текущем потоке
+_suppressed = threading.local()
+
+
+@contextmanager
+def row_signals_suppressed():
+    """
+    Пропуск изменения счетчиков и сброса ролей для каждой строки членства в текущем потоке
+
+    Используется массовыми операциями, которые сами пересчитывают счетчики и сбрасывают роли
+    """
+    _suppressed.active = True
+    try:
+        yield
+    finally:
+        _suppressed.active = False
+
+
+def _row_signals_active():
+    return not getattr(_suppressed, 'active', False)
+
+
+@receiver(post_init, sender=MembersInOrganization)
+@receiver(post_init, sender=EventOrganizers)
+def remember_role_user(sender, instance, **kwargs):
+    """
+    Запоминание исходного пользователя строки членства
+    """
+    instance._role_user_id = instance.user_id
+
+
+@receiver(post_save, sender=MembersInOrganization)
+@receiver(post_delete, sender=MembersInOrganization)
+@receiver(post_save, sender=EventOrganizers)
+@receiver(post_delete, sender=EventOrganizers)
+def reset_user_roles(sender, instance, **kwargs):
+    """
+    Сброс ролей пользователя при изменении членства
+    """
+    if not _row_signals_active():
+        return
+    invalidate_user_roles(instance.user_id)
+    if instance._role_user_id not in (None, instance.user_id):
+        invalidate_user_roles(instance._role_user_id)
+    instance._role_user_id = instance.user_id
+
+
+@receiver(post_init, sender=MembersInOrganization)
+@receiver(post_init, sender=EventOrganizers)
+@receiver(post_init, sender=EventGuests)
+def remember_parent(sender, instance, **kwargs):
+    """
+    Запоминание исходного родительского объекта строки
+    """
+    field_name = f'{COUNTERS[sender][0]}_id'
+    if field_name in instance.get_deferred_fields():
+        instance._parent_id = None
+    else:
+        instance._parent_id = getattr(instance, field_name)
+
+
+@receiver(post_save, sender=MembersInOrganization)
+@receiver(post_save, sender=EventOrganizers)
+@receiver(post_save, sender=EventGuests)
+def count_saved_row(sender, instance, created, **kwargs):
+    """
+    Обновление счетчика и updated_at родительского объекта после сохранения строки
+    """
+    parent_id = getattr(instance, f'{COUNTERS[sender][0]}_id')
+    if created:
+        change_counter(sender, parent_id, 1)
+    elif instance._parent_id not in (None, parent_id):
+        change_counter(sender, instance._parent_id, -1)
+        change_counter(sender, parent_id, 1)
+    else:
+        change_counter(sender, parent_id, 0)
+    instance._parent_id = parent_id
+
+
+@receiver(post_delete, sender=MembersInOrganization)
+@receiver(post_delete, sender=EventOrganizers)
+@receiver(post_delete, sender=EventGuests)
+def count_deleted_row(sender, instance, **kwargs):
+    """
+    Обновление счетчика и updated_at родительского объекта после удаления строки
+    """
+    if not _row_signals_active():
+        return
+    change_counter(sender, getattr(instance, f'{COUNTERS[sender][0]}_id'), -1)
+
+
+@receiver(m2m_changed, sender=Event.guests.through)
+def count_event_guests(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Пересчет количества участников при изменении Event.guests через менеджер связи (bulk_create без сигналов)
+    """
+    if action == 'pre_clear':
+        instance._cleared_event_ids = (set(sender.objects.filter(user=instance).values_list('event_id', flat=True))
+                                       if reverse else {instance.pk})
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        event_ids = instance._cleared_event_ids if action == 'post_clear' else (pk_set if reverse else {instance.pk})
+        if event_ids:
+            recount(EventGuests, event_ids)
+
+
+@receiver(m2m_changed, sender=Event.event_category.through)
+@receiver(m2m_changed, sender=Event.event_type.through)
+def touch_event_relations(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Обновление updated_at мероприятия при изменении связей многие-ко-многим
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    event_ids = pk_set if reverse else {instance.pk}
+    if event_ids:
+        Event.objects.filter(pk__in=event_ids).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Organization)
+def refresh_search_vector(sender, instance, **kwargs):
+    """
+    Обновление поискового вектора после сохранения
+    """
+    update_search_vectors(sender.objects.filter(pk=instance.pk))
+
+
+@receiver(post_init, sender=Notification)
+def remember_notification_state(sender, instance, **kwargs):
+    """
+    Запоминание исходного состояния уведомления
+    """
+    instance._counted_unread = (instance.user_id, instance.viewed)
+
+
+@receiver(post_save, sender=Notification)
+def count_saved_notification(sender, instance, created, **kwargs):
+    """
+    Обновление счетчика непрочитанных после фиксации сохранения уведомления
+    """
+    old_user_id, old_viewed = instance._counted_unread
+    if not created and not old_viewed:
+        transaction.on_commit(partial(change_unread_count, old_user_id, -1))
+    if not instance.viewed:
+        transaction.on_commit(partial(change_unread_count, instance.user_id, 1))
+    instance._counted_unread = (instance.user_id, instance.viewed)
+    if created:
+        transaction.on_commit(lambda: publish_notifications([instance]))
+
+
+@receiver(post_delete, sender=Notification)
+def count_deleted_notification(sender, instance, **kwargs):
+    """
+    Обновление счетчика непрочитанных после фиксации удаления уведомления
+    """
+    old_user_id, old_viewed = instance._counted_unread
+    if not old_viewed:
+        transaction.on_commit(partial(change_unread_count, old_user_id, -1))
+
+
+def _stored_derivatives(sender, instance):
+    """
+    Запись о производных изображениях объекта в базе данных
+
+    Запись обновляется командой generate_image_derivatives --loop (процесс images из Procfile),
+    поэтому в загруженном ранее объекте она может быть устаревшей
+    """
+    field_name = derivatives_field_name(IMAGE_FIELDS[sender._meta.label])
+    return field_name, sender._default_manager.filter(pk=instance.pk).values_list(field_name, flat=True).first()
+
+
+@receiver(pre_save, sender=User)
+@receiver(pre_save, sender=Organization)
+@receiver(pre_save, sender=Event)
+@receiver(pre_save, sender=Slide)
+def keep_image_derivatives(sender, instance, update_fields=None, **kwargs):
+    """
+    Сохранение записи о производных изображениях, созданной после загрузки объекта
+    """
+    field_name = derivatives_field_name(IMAGE_FIELDS[sender._meta.label])
+    if (instance._state.adding or getattr(instance, '_derivatives_generated', False)
+            or field_name in instance.get_deferred_fields()
+            or (update_fields is not None and field_name not in update_fields)):
+        return
+    field_name, derivatives = _stored_derivatives(sender, instance)
+    if derivatives is not None:
+        setattr(instance, field_name, derivatives)
+
+
+@receiver(pre_delete, sender=User)
+@receiver(pre_delete, sender=Organization)
+@receiver(pre_delete, sender=Event)
+@receiver(pre_delete, sender=Slide)
+def delete_image_derivatives(sender, instance, **kwargs):
+    """
+    Удаление производных изображений удаленного объекта после фиксации удаления
+    """
+    field_name, derivatives = _stored_derivatives(sender, instance)
+    if derivatives:
+        transaction.on_commit(partial(delete_model_derivatives, sender._meta.label,
+                                      IMAGE_FIELDS[sender._meta.label], derivatives))
+
+
+@receiver(post_save, sender=User)
+def refresh_auth_version(sender, instance, **kwargs):
+    """
+    Обновление версии полей пользователя из JWT после фиксации сохранения
+    """
+    transaction.on_commit(partial(set_auth_version, instance))
+
+
+@receiver(post_delete, sender=User)
+def reset_auth_version(sender, instance, **kwargs):
+    """
+    Удаление версии полей пользователя из JWT после фиксации удаления
+    """
+    transaction.on_commit(partial(delete_auth_version, instance.pk))
@@ -1,3 +1,979 @@
-from django.test import TestCase
+import asyncio
+import csv
+import datetime
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+from django.contrib.auth.tokens import default_token_generator
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.test import TestCase, TransactionTestCase, override_settings
+from djoser.utils import encode_uid
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from api import bulk
+from api.caching import shared_timeout
+from api.hashers import ScryptPasswordHasher
+from api.mail import OutboxEmailBackend, claim_outbox, deliver_outbox
+from api.models import School, User, Organization, Event, EventCategory, EventType, EventGuests, EventOrganizers, \
+    MembersInOrganization, Notification, OutgoingEmail, Slide
+from api.notifications import fan_out, notify_event, get_unread_count
+from api.realtime import BaseBroker, notification_stream
+from api.serializers.token_serializer import TokenObtainPairWithClaimsSerializer
+from api.validators import ImageHeader, image_validator, read_image_header
+from api.roles import get_cached_user_roles, get_user_roles, role_cache_stats
+
+
+def create_events(organization, count, start=0):
+    """
+    Создание мероприятий с категорией, типом, гостем и руководителем
+    """
+    category = EventCategory.objects.create(name=f'Категория {start}')
+    event_type = EventType.objects.create(name=f'Тип {start}')
+    events = []
+    for number in range(start, start + count):
+        event = Event.objects.create(name=f'Мероприятие {number}', organization=organization,
+                                     time=datetime.time(10), auditorium='D734',
+                                     date=datetime.date(2026, 1, 1), date_end=datetime.date(2026, 1, 2))
+        user = User.objects.create_user(email=f'user{number}@dvfu.ru', password='password')
+        EventGuests.objects.create(user=user, event=event)
+        EventOrganizers.objects.create(user=user, event=event, role='leader')
+        event.event_category.add(category)
+        event.event_type.add(event_type)
+        events.append(event)
+    return events
+
+
+def image_file(name, width, height, fmt='PNG'):
+    """
+    Загружаемый файл изображения заданного размера
+    """
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'red').save(buffer, fmt)
+    return SimpleUploadedFile(name, buffer.getvalue(), f'image/{fmt.lower()}')
+
+
+class EventQueryCountTests(TestCase):
+    """
+    Количество запросов к базе данных в списке мероприятий не зависит от количества строк
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Клуб')
+
+    def assertListQueries(self, url, num):
+        for count, start in ((3, 0), (27, 3)):
+            create_events(self.organization, count, start)
+            with self.assertNumQueries(num):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['results']), start + count)
+
+    def test_list(self):
+        # Мероприятия, категории и типы
+        self.assertListQueries('/api/events/', 3)
+
+    def test_list_expanded(self):
+        # Плюс организаторы и гости
+        self.assertListQueries('/api/events/?expand=guests,organizers', 5)
+
+
+class CursorPaginationTests(TestCase):
+    """
+    Курсорная пагинация списков и отключение пагинации
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.events = create_events(Organization.objects.create(name='Клуб'), 5)
+
+    def test_pages_follow_cursor(self):
+        ids = []
+        url = '/api/events/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertLessEqual(len(data['results']), 2)
+            ids += [event['id'] for event in data['results']]
+            url = data['next']
+        self.assertEqual(ids, [event.id for event in reversed(self.events)])
+
+    def test_unpaginated(self):
+        response = self.client.get('/api/events/?unpaginated=true')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 5)
+
+
+class EventFilterTests(TestCase):
+    """
+    Фильтрация и сортировка списка мероприятий
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Клуб')
+        self.first, self.second, self.third = create_events(self.organization, 3)
+        Event.objects.filter(pk=self.second.pk).update(date=datetime.date(2026, 3, 1), status='verify',
+                                                       level='regional')
+        Event.objects.filter(pk=self.third.pk).update(date=datetime.date(2026, 5, 1),
+                                                      organization=Organization.objects.create(name='Театр'))
+        self.category = EventCategory.objects.create(name='Спорт')
+        self.third.event_category.add(self.category)
+
+    def assertFiltered(self, query, events):
+        response = self.client.get(f'/api/events/?{query}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({event['id'] for event in response.json()['results']}, {event.id for event in events})
+
+    def test_filters(self):
+        self.assertFiltered('date_after=2026-02-01', [self.second, self.third])
+        self.assertFiltered('date_after=2026-02-01&date_before=2026-04-01', [self.second])
+        self.assertFiltered('status=verify,denied', [self.second])
+        self.assertFiltered('level=regional', [self.second])
+        self.assertFiltered(f'organization={self.organization.id}', [self.first, self.second])
+        self.assertFiltered(f'event_category={self.category.id}', [self.third])
+
+    def test_ordering(self):
+        response = self.client.get('/api/events/?ordering=-date')
+        self.assertEqual([event['id'] for event in response.json()['results']],
+                         [self.third.id, self.second.id, self.first.id])
+
+    def test_invalid_params(self):
+        for query in ('date_after=01.02.2026', 'status=unknown', 'organization=club'):
+            response = self.client.get(f'/api/events/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+
+
+class SearchTests(TestCase):
+    """
+    Поиск мероприятий и организаций (в SQLite - поиск подстрок по всем словам запроса)
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Шахматный клуб', description='Турниры по шахматам')
+        self.events = create_events(self.organization, 3)
+        Event.objects.filter(pk=self.events[0].pk).update(name='Шахматный турнир')
+
+    def test_search(self):
+        response = self.client.get('/api/search/?q=Шахматный турнир')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([event['id'] for event in data['events']], [self.events[0].id])
+        self.assertEqual(data['organizations'], [])
+
+        response = self.client.get('/api/search/?q=Шахматный')
+        self.assertEqual([organization['id'] for organization in response.json()['organizations']],
+                         [self.organization.id])
+
+    def test_limit(self):
+        response = self.client.get('/api/search/?q=Мероприятие&limit=2')
+        self.assertEqual(len(response.json()['events']), 2)
+        response = self.client.get('/api/search/?q=Мероприятие&limit=-5')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['events']), 1)
+
+    def test_invalid_params(self):
+        for query in ('q=', 'q=клуб&limit=много'):
+            self.assertEqual(self.client.get(f'/api/search/?{query}').status_code, 400, query)
+
+
+class UnreadCountTests(TransactionTestCase):
+    """
+    Счетчик непрочитанных уведомлений в кеше
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='reader@dvfu.ru')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def assertCachedCount(self, count):
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.user.id), count)
+
+    def test_count_follows_changes(self):
+        notifications = [Notification.objects.create(user=self.user, message=f'Уведомление {number}')
+                         for number in range(3)]
+        self.assertEqual(self.client.get('/api/notification/unread-count/').json(), {'count': 3})
+
+        Notification.objects.create(user=self.user, message='Новое')
+        self.assertCachedCount(4)
+
+        response = self.client.post('/api/notification/mark-viewed/',
+                                    {'ids': [notification.id for notification in notifications[:2]]}, format='json')
+        self.assertEqual(response.json(), {'updated': 2})
+        self.assertCachedCount(2)
+
+        response = self.client.post('/api/notification/mark-all-viewed/')
+        self.assertEqual(response.json(), {'updated': 2})
+        self.assertCachedCount(0)
+
+    def test_rolled_back_notification_is_not_counted(self):
+        self.assertEqual(get_unread_count(self.user.id), 0)
+        with transaction.atomic():
+            Notification.objects.create(user=self.user, message='Отмененное')
+            transaction.set_rollback(True)
+        self.assertCachedCount(0)
+
+
+class RecordingBroker(BaseBroker):
+    """
+    Брокер, запоминающий опубликованные события подписанных пользователей
+    """
+    def __init__(self, subscribed_ids):
+        self.subscribed_ids = set(subscribed_ids)
+        self.published = []
+
+    def has_subscribers(self, user_id):
+        return user_id in self.subscribed_ids
+
+    def publish(self, user_id, payload):
+        self.published.append((user_id, payload['message']))
+
+
+class FanOutTests(TransactionTestCase):
+    """
+    Массовое создание уведомлений
+    """
+    def setUp(self):
+        cache.clear()
+        self.event, = create_events(Organization.objects.create(name='Клуб'), 1)
+        self.users = [User.objects.create_user(email=f'guest{number}@dvfu.ru') for number in range(5)]
+        for user in self.users:
+            EventGuests.objects.create(user=user, event=self.event)
+
+    def test_event_recipients_are_unique(self):
+        # Гость, который также руководит мероприятием, получает одно уведомление
+        EventOrganizers.objects.create(user=self.users[0], event=self.event, role='leader')
+        self.assertEqual(notify_event(self.event.id, 'Перенос', ''), 6)
+        self.assertEqual(Notification.objects.filter(user=self.users[0]).count(), 1)
+
+    def test_batches(self):
+        with CaptureQueriesContext(connection) as queries:
+            fan_out([user.id for user in self.users], 'Перенос', '', batch_size=2)
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(Notification.objects.count(), 5)
+
+    def test_published_after_commit_to_subscribers(self):
+        broker = RecordingBroker([self.users[1].id, self.users[3].id])
+        with mock.patch('api.notifications.get_broker', return_value=broker), \
+                mock.patch('api.realtime.get_broker', return_value=broker):
+            fan_out([user.id for user in self.users], 'Перенос', '', batch_size=2)
+        self.assertEqual(sorted(broker.published), [(self.users[1].id, 'Перенос'), (self.users[3].id, 'Перенос')])
+
+
+class FailingEmailBackend(BaseEmailBackend):
+    """
+    Почтовый бэкенд, не отправляющий ни одного письма
+    """
+    def send_messages(self, email_messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+@override_settings(OUTBOX_DELIVERY_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+                   OUTBOX_MAX_ATTEMPTS=3, OUTBOX_RETRY_DELAY=60, OUTBOX_LEASE=300)
+class OutboxTests(TestCase):
+    """
+    Очередь исходящих писем
+    """
+    def queue(self, **kwargs):
+        message = EmailMultiAlternatives('Тема', 'Текст', 'from@dvfu.ru', ['to@dvfu.ru'],
+                                         connection=OutboxEmailBackend(), **kwargs)
+        message.send()
+        return OutgoingEmail.objects.latest('id')
+
+    def test_round_trip(self):
+        message = EmailMultiAlternatives('Тема', 'Текст', 'from@dvfu.ru', ['to@dvfu.ru'], cc=['cc@dvfu.ru'],
+                                         headers={'X-Event': '1'}, connection=OutboxEmailBackend())
+        message.attach_alternative('<p>Текст</p>', 'text/html')
+        message.attach('list.csv', 'id;name\n1;Клуб\n', 'text/csv')
+        message.attach('logo.png', b'\x89PNG\r\n\x00\xff', 'image/png')
+        message.send()
+
+        self.assertEqual(deliver_outbox(), (1, 0))
+        delivered, = mail.outbox
+        self.assertEqual((delivered.subject, delivered.body, delivered.to, delivered.cc),
+                         ('Тема', 'Текст', ['to@dvfu.ru'], ['cc@dvfu.ru']))
+        self.assertEqual(delivered.extra_headers, {'X-Event': '1'})
+        self.assertEqual(delivered.alternatives, [('<p>Текст</p>', 'text/html')])
+        self.assertEqual(delivered.attachments, [('list.csv', 'id;name\n1;Клуб\n', 'text/csv'),
+                                                 ('logo.png', b'\x89PNG\r\n\x00\xff', 'image/png')])
+        self.assertEqual(OutgoingEmail.objects.get().status, OutgoingEmail.StatusChoices.SENT)
+
+    def test_mime_attachment_is_rejected(self):
+        message = EmailMultiAlternatives('Тема', 'Текст', 'from@dvfu.ru', ['to@dvfu.ru'],
+                                         connection=OutboxEmailBackend())
+        message.attach(EmailMultiAlternatives('Вложенное').message())
+        with self.assertRaises(ValueError):
+            message.send()
+
+    @override_settings(OUTBOX_DELIVERY_BACKEND='api.tests.FailingEmailBackend')
+    def test_retry_with_backoff(self):
+        row = self.queue()
+        for attempt, delay in ((1, 60), (2, 120)):
+            started = timezone.now()
+            self.assertEqual(deliver_outbox(), (0, 1))
+            row.refresh_from_db()
+            self.assertEqual((row.status, row.attempts), (OutgoingEmail.StatusChoices.PENDING, attempt))
+            self.assertIn('SMTP недоступен', row.last_error)
+            self.assertGreaterEqual(row.next_attempt_at, started + datetime.timedelta(seconds=delay))
+            # До следующей попытки письмо не захватывается
+            self.assertEqual(deliver_outbox(), (0, 0))
+            OutgoingEmail.objects.filter(pk=row.pk).update(next_attempt_at=timezone.now())
+
+        self.assertEqual(deliver_outbox(), (0, 1))
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), (OutgoingEmail.StatusChoices.FAILED, 3))
+
+    def test_expired_lease_is_claimed_again(self):
+        row = self.queue()
+        claimed, = claim_outbox()
+        self.assertEqual((claimed.status, claimed.attempts), (OutgoingEmail.StatusChoices.SENDING, 1))
+        self.assertEqual(claim_outbox(), [])
+
+        # Обработчик остановился, не отправив письмо
+        OutgoingEmail.objects.filter(pk=row.pk).update(next_attempt_at=timezone.now())
+        claimed, = claim_outbox()
+        self.assertEqual(claimed.attempts, 2)
+
+        OutgoingEmail.objects.filter(pk=row.pk).update(next_attempt_at=timezone.now(), attempts=3)
+        self.assertEqual(claim_outbox(), [])
+        row.refresh_from_db()
+        self.assertEqual(row.status, OutgoingEmail.StatusChoices.FAILED)
+
+
+class UserActivationTests(TransactionTestCase):
+    """
+    Активация профиля по ссылке из письма
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='new@dvfu.ru', password='password', is_active=False)
+        self.url = f'/api/activate/{encode_uid(self.user.pk)}/{default_token_generator.make_token(self.user)}/'
+
+    def test_activation_queues_confirmation(self):
+        response = self.client.get(self.url, HTTP_HOST='fefu.example')
+        self.assertEqual(response.status_code, 302)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.is_active)
+        email, = OutgoingEmail.objects.all()
+        self.assertEqual(email.to, ['new@dvfu.ru'])
+
+        # Повторная ссылка не активирует профиль и не отправляет письмо снова
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(OutgoingEmail.objects.count(), 1)
+
+    def test_invalid_link(self):
+        response = self.client.get(f'/api/activate/{encode_uid(self.user.pk)}/invalid/')
+        self.assertEqual(response.status_code, 302)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertFalse(OutgoingEmail.objects.exists())
+
+
+class NotificationStreamTests(TransactionTestCase):
+    """
+    Аутентификация потока уведомлений (Server-Sent Events)
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='reader@dvfu.ru')
+
+    def open_stream(self, query_string=b''):
+        """
+        Статус ответа потока, поток закрывается сразу после начала ответа
+        """
+        messages = []
+
+        async def run():
+            started = asyncio.Event()
+
+            async def receive():
+                await started.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                messages.append(message)
+                started.set()
+
+            scope = {'type': 'http', 'path': '/api/notification/stream/', 'headers': [],
+                     'query_string': query_string}
+            await asyncio.wait_for(notification_stream(scope, receive, send), timeout=5)
+
+        asyncio.run(run())
+        return messages[0]['status']
+
+    def token(self):
+        return str(TokenObtainPairWithClaimsSerializer.get_token(self.user).access_token)
+
+    def test_rejects_missing_and_invalid_tokens(self):
+        self.assertEqual(self.open_stream(), 401)
+        self.assertEqual(self.open_stream(b'token=invalid'), 401)
+
+    def test_rejects_inactive_user(self):
+        token = self.token()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.open_stream(f'token={token}'.encode()), 401)
+
+    def test_accepts_valid_token(self):
+        self.assertEqual(self.open_stream(f'token={self.token()}'.encode()), 200)
+
+
+class UserRolesTests(TransactionTestCase):
+    """
+    Сброс кеша ролей сигналами членства
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='member@dvfu.ru', password='password')
+        self.organization = Organization.objects.create(name='Клуб')
+        self.event, = create_events(self.organization, 1)
+
+    def test_organization_membership_resets_roles(self):
+        self.assertIsNone(get_cached_user_roles(self.user.id).organization_role(self.organization.id))
+        member = MembersInOrganization.objects.create(user=self.user, organization=self.organization)
+        self.assertEqual(get_cached_user_roles(self.user.id).organization_role(self.organization.id), 'member')
+
+        member.role = 'leader'
+        member.save()
+        self.assertTrue(get_cached_user_roles(self.user.id).is_organization_leader(self.organization.id))
+
+        member.delete()
+        self.assertFalse(get_cached_user_roles(self.user.id).is_member())
+
+    def test_event_organizer_resets_roles_within_request(self):
+        request = type('Request', (), {'user': self.user})()
+        self.assertFalse(get_user_roles(request).is_event_leader(self.event.id))
+        EventOrganizers.objects.create(user=self.user, event=self.event, role='leader')
+        self.assertTrue(get_user_roles(request).is_event_leader(self.event.id))
+
+    def test_cached_roles_are_counted(self):
+        before = role_cache_stats()
+        get_cached_user_roles(self.user.id)
+        get_cached_user_roles(self.user.id)
+        after = role_cache_stats()
+        self.assertEqual((after['misses'] - before['misses'], after['hits'] - before['hits']), (1, 1))
+
+    def test_stats_are_for_admins(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        self.assertEqual(client.get('/api/stats/role-cache/').status_code, 403)
+        client.force_authenticate(User.objects.create_user(email='admin@dvfu.ru', is_staff=True))
+        response = client.get('/api/stats/role-cache/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()), {'hits', 'misses', 'pid'})
+
+
+class ImageDerivativeTests(TransactionTestCase):
+    """
+    Производные изображения и srcset
+    """
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client = APIClient()
+        self.slide = Slide.objects.create(name='Слайд', link='/', img=image_file('a.png', 1000, 500))
+
+    def srcset(self):
+        return self.client.get(f'/api/slides/{self.slide.id}/').json()['img_srcset']
+
+    def generate(self):
+        call_command('generate_image_derivatives', 'api.Slide', stdout=StringIO())
+
+    def test_srcset_lists_recorded_files(self):
+        self.assertEqual(set(self.srcset()), {'original'})
+
+        self.generate()
+        self.assertEqual(set(self.srcset()['webp']), {'160w', '480w', '960w'})
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, 'a_160w.webp')))
+
+        # В srcset попадают только файлы из записи, а не все файлы рядом с оригиналом
+        derivatives = Slide.objects.get().img_derivatives
+        derivatives['files']['webp'] = {'160': 'a_160w.webp'}
+        Slide.objects.update(img_derivatives=derivatives)
+        cache.clear()
+        self.assertEqual(set(self.srcset()['webp']), {'160w'})
+
+    def test_replaced_image(self):
+        self.generate()
+        # Объект загружен до создания производных изображений, их запись не затирается
+        self.slide.img = image_file('b.png', 300, 100)
+        self.slide.save()
+        # Производные изображения старого файла не выводятся для нового
+        self.assertEqual(set(self.srcset()), {'original'})
+
+        self.generate()
+        self.assertEqual(set(self.srcset()['webp']), {'160w', '300w'})
+        self.assertFalse([name for name in os.listdir(self.media_root) if name.startswith('a_')])
+
+    def test_deleted_object(self):
+        self.generate()
+        self.slide.delete()
+        self.assertEqual(sorted(os.listdir(self.media_root)), ['a.png'])
+
+
+class ImageHeaderValidatorTests(TestCase):
+    """
+    Проверка изображений по заголовку без декодирования
+    """
+    def test_reads_header(self):
+        for fmt, expected in (('PNG', 'png'), ('GIF', 'gif'), ('BMP', 'bmp'), ('WEBP', 'webp'), ('JPEG', 'jpeg')):
+            self.assertEqual(read_image_header(image_file('image', 300, 200, fmt)), ImageHeader(expected, 300, 200))
+
+    def test_reads_jpeg_size_after_exif(self):
+        buffer = BytesIO()
+        Image.new('RGB', (640, 480)).save(buffer, 'JPEG', exif=b'Exif\x00\x00' + b'\x00' * 4000)
+        self.assertEqual(read_image_header(BytesIO(buffer.getvalue())), ImageHeader('jpeg', 640, 480))
+
+    def test_rejects_bad_images(self):
+        png = image_file('image.png', 100, 100).read()
+        for content in (b'<html></html>' * 10, png[:20], b'\xff\xd8' + b'\x00' * 40):
+            with self.assertRaises(ValidationError):
+                image_validator(SimpleUploadedFile('image.png', content))
+
+    def test_rejects_format_and_size(self):
+        with self.assertRaisesMessage(ValidationError, 'unsupported image file format'):
+            image_validator(image_file('image.gif', 100, 100, 'GIF'))
+        with self.assertRaisesMessage(ValidationError, 'Invalid image height'):
+            image_validator(image_file('image.png', 100, 2000))
+        image_validator(image_file('image.png', 1600, 1600))
+
+
+class ImageUploadTests(TestCase):
+    """
+    Отклонение изображений обработчиком загрузки по первому блоку данных
+    """
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email='admin@dvfu.ru', is_staff=True))
+
+    def post_slide(self, img):
+        return self.client.post('/api/slides/', {'name': 'Слайд', 'link': '/', 'img': img}, format='multipart')
+
+    def test_accepts_image(self):
+        self.assertEqual(self.post_slide(image_file('slide.png', 100, 50)).status_code, 201)
+
+    @override_settings(IMAGE_UPLOAD_LIMITS={'api.Slide.img': 1024})
+    def test_rejects_oversized_image(self):
+        response = self.post_slide(image_file('slide.bmp', 100, 100, 'BMP'))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('larger than 1024 bytes', response.json()['detail'])
+        self.assertEqual(os.listdir(self.media_root), [])
+
+    def test_rejects_bad_magic(self):
+        response = self.post_slide(SimpleUploadedFile('slide.png', b'<?php echo 1; ?>' * 4, 'image/png'))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('cannot be opened', response.json()['detail'])
+
+    def test_rejects_by_field_validators(self):
+        organization = Organization.objects.create(name='Клуб')
+        response = self.client.patch(f'/api/organizations/{organization.id}/',
+                                     {'image': image_file('logo.png', 2000, 10)}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Invalid image width', response.json()['detail'])
+
+    def test_ignores_fields_of_other_models(self):
+        # У уведомлений нет поля изображения, файл с именем image не проверяется
+        user = User.objects.create_user(email='reader@dvfu.ru')
+        response = self.client.post('/api/notification/', {'user': user.id, 'message': 'Текст', 'link': '/',
+                                                           'image': SimpleUploadedFile('x.png', b'not an image')},
+                                    format='multipart')
+        self.assertEqual(response.status_code, 201)
+
+
+class ExplainQueriesTests(TestCase):
+    """
+    Основные запросы API используют индексы
+    """
+    def test_no_seq_scan(self):
+        if connection.vendor == 'postgresql':
+            # На пустых таблицах планировщик выбирает последовательное сканирование даже при наличии индекса
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        call_command('explain_queries', fail_on_seq_scan=True, stdout=StringIO())
+
+
+class ConditionalEventTests(TestCase):
+    """
+    ETag мероприятия и обновление с If-Match
+    """
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(email='admin@dvfu.ru', is_staff=True))
+        self.event, = create_events(Organization.objects.create(name='Клуб'), 1)
+        self.category = EventCategory.objects.create(name='Спорт')
+
+    def test_etag_after_relation_change_matches(self):
+        url = f'/api/events/{self.event.id}/'
+        response = self.client.patch(url, {'event_category': [self.category.id]}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.patch(url, {'name': 'Турнир'}, format='json', HTTP_IF_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+
+class ReferenceCacheTests(TransactionTestCase):
+    """
+    ETag и кеш ответов справочников
+    """
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_not_modified_until_table_changes(self):
+        School.objects.create(name='Школа естественных наук')
+        response = self.client.get('/api/schools/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get('/api/schools/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        School.objects.create(name='Школа искусств')
+        response = self.client.get('/api/schools/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.json()['results']), 2)
+
+
+class TokenClaimsAuthenticationTests(TransactionTestCase):
+    """
+    Пользователь из утверждений JWT и версия его полей
+    """
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='admin@dvfu.ru', password='password', is_staff=True)
+
+    def test_demotion_applies_to_issued_tokens(self):
+        response = self.client.post('/api/auth/jwt/create/', {'email': 'admin@dvfu.ru', 'password': 'password'})
+        self.client.credentials(HTTP_AUTHORIZATION=f'JWT {response.json()["access"]}')
+        response = self.client.post('/api/event-types/', {'name': 'Лекция'})
+        self.assertEqual(response.status_code, 201)
+
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.post('/api/event-types/', {'name': 'Семинар'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_bulk_demotion_applies_to_issued_tokens(self):
+        response = self.client.post('/api/auth/jwt/create/', {'email': 'admin@dvfu.ru', 'password': 'password'})
+        self.client.credentials(HTTP_AUTHORIZATION=f'JWT {response.json()["access"]}')
+        response = self.client.post('/api/event-types/', {'name': 'Лекция'})
+        self.assertEqual(response.status_code, 201)
+
+        User.objects.filter(is_staff=True).update(is_staff=False)
+        response = self.client.post('/api/event-types/', {'name': 'Семинар'})
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(LOCAL_CACHE_TIMEOUT=5)
+    def test_local_cache_timeout_is_capped(self):
+        self.assertEqual(shared_timeout(60 * 60 * 24), 5)
+
+
+class BulkRowsTests(TestCase):
+    """
+    Отчет массового добавления и удаления гостей мероприятий по каждой строке
+    """
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        organization = Organization.objects.create(name='Клуб')
+        self.event, self.other_event = create_events(organization, 2)
+        self.leader = User.objects.get(email='user0@dvfu.ru')
+        self.user = User.objects.create_user(email='guest@dvfu.ru', password='password')
+        self.client.force_authenticate(self.leader)
+
+    def statuses(self, url, rows):
+        response = self.client.post(url, {'rows': rows}, format='json')
+        self.assertEqual(response.status_code, 200)
+        return [row['status'] for row in response.json()['results']]
+
+    def test_create_statuses(self):
+        statuses = self.statuses('/api/event-guests/bulk/', [
+            {'event': self.event.pk, 'user': self.user.pk},
+            {'event': self.event.pk, 'user': self.leader.pk},
+            {'event': self.event.pk, 'user': self.user.pk},
+            {'event': 'x'},
+            {'event': 10 ** 6, 'user': self.user.pk},
+            {'event': self.other_event.pk, 'user': self.user.pk},
+            {'event': self.other_event.pk},
+        ])
+        self.assertEqual(statuses, ['created', 'exists', 'duplicate', 'invalid', 'not_found', 'forbidden',
+                                    'created'])
+        self.event.refresh_from_db()
+        self.other_event.refresh_from_db()
+        self.assertEqual((self.event.guests_count, self.other_event.guests_count), (2, 2))
+
+    def test_concurrent_insert_is_reported_as_existing(self):
+        existing_pairs = bulk._existing_pairs
+
+        def concurrent_insert(model, accepted):
+            # Пара добавлена другим запросом между проверкой и вставкой
+            if not model.objects.filter(user=self.user, event=self.event).exists():
+                pairs = existing_pairs(model, accepted)
+                model.objects.create(user=self.user, event=self.event)
+                return pairs
+            return existing_pairs(model, accepted)
+
+        other = User.objects.create_user(email='other@dvfu.ru', password='password')
+        with mock.patch('api.bulk._existing_pairs', side_effect=concurrent_insert):
+            statuses = self.statuses('/api/event-guests/bulk/', [
+                {'event': self.event.pk, 'user': self.user.pk},
+                {'event': self.event.pk, 'user': other.pk},
+            ])
+        self.assertEqual(statuses, ['exists', 'created'])
+        self.assertEqual(EventGuests.objects.filter(event=self.event).count(), 3)
+
+    def test_delete_statuses(self):
+        EventGuests.objects.create(user=self.user, event=self.event)
+        statuses = self.statuses('/api/event-guests/bulk-delete/', [
+            {'event': self.event.pk, 'user': self.user.pk},
+            {'event': self.event.pk, 'user': self.user.pk},
+            {'event': self.event.pk, 'user': User.objects.create_user(email='new@dvfu.ru').pk},
+            {'event': self.other_event.pk, 'user': User.objects.get(email='user1@dvfu.ru').pk},
+            {'user': self.user.pk},
+        ])
+        self.assertEqual(statuses, ['deleted', 'duplicate', 'missing', 'forbidden', 'invalid'])
+        self.assertFalse(EventGuests.objects.filter(user=self.user).exists())
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.guests_count, 1)
+
+
+class ExportTests(TestCase):
+    """
+    Выгрузка гостей мероприятия и членов организации в CSV
+    """
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.organization = Organization.objects.create(name='Клуб')
+        self.event, = create_events(self.organization, 1)
+        self.leader = User.objects.get(email='user0@dvfu.ru')
+        self.guest = User.objects.create_user(email='guest@dvfu.ru', password='password',
+                                              surname='=HYPERLINK("http://example.com")', name='Иван, "Ваня"')
+        EventGuests.objects.create(user=self.guest, event=self.event)
+
+    def export(self, url):
+        response = self.client.get(url)
+        if response.status_code != 200:
+            return response.status_code, None
+        content = b''.join(response.streaming_content).decode('utf-8')
+        return response.status_code, list(csv.reader(StringIO(content.lstrip('\ufeff'))))
+
+    def test_guests_export_escapes_cells(self):
+        self.client.force_authenticate(self.leader)
+        status, rows = self.export(f'/api/events/{self.event.pk}/guests-export/')
+        self.assertEqual(status, 200)
+        self.assertEqual(rows[0][:3], ['Email', 'Фамилия', 'Имя'])
+        self.assertEqual(len(rows), 3)
+        guest_row = next(row for row in rows if row[0] == 'guest@dvfu.ru')
+        self.assertEqual(guest_row[1], "'" + self.guest.surname)
+        self.assertEqual(guest_row[2], 'Иван, "Ваня"')
+
+    def test_guests_export_is_forbidden_for_guests(self):
+        self.client.force_authenticate(self.guest)
+        self.assertEqual(self.export(f'/api/events/{self.event.pk}/guests-export/')[0], 403)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.export(f'/api/events/{self.event.pk}/guests-export/')[0], 401)
+
+    def test_members_export_is_for_leaders(self):
+        MembersInOrganization.objects.create(user=self.guest, organization=self.organization)
+        url = f'/api/organizations/{self.organization.pk}/members-export/'
+        self.client.force_authenticate(self.guest)
+        self.assertEqual(self.export(url)[0], 403)
+
+        MembersInOrganization.objects.create(user=self.leader, organization=self.organization, role='leader')
+        self.client.force_authenticate(self.leader)
+        status, rows = self.export(url)
+        self.assertEqual(status, 200)
+        self.assertCountEqual([row[0] for row in rows[1:]], ['guest@dvfu.ru', 'user0@dvfu.ru'])
+
+
+class ImportDirectoryTests(TestCase):
+    """
+    Импорт справочника пользователей командой import_directory
+    """
+    def setUp(self):
+        cache.clear()
+        self.organization = Organization.objects.create(name='Клуб')
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def import_file(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_directory', path, '--workers', '1', stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_rows_are_upserted(self):
+        header = 'email,password,name,school,faculty,organization,role\n'
+        self.import_file('users.csv', header +
+                         f'ivanov@dvfu.ru,secret,Иван,ШЕН,ИТ,{self.organization.pk},member\n'
+                         'petrov@dvfu.ru,,Петр,ШЕН,,,\n')
+        ivanov = User.objects.get(email='ivanov@dvfu.ru')
+        self.assertTrue(ivanov.check_password('secret'))
+        self.assertEqual((ivanov.school.name, ivanov.faculty.name), ('ШЕН', 'ИТ'))
+        self.assertFalse(User.objects.get(email='petrov@dvfu.ru').has_usable_password())
+
+        stdout, stderr = self.import_file('users.csv', header +
+                                          f'ivanov@dvfu.ru,,Иоанн,ШЕН,ИТ,{self.organization.pk},leader\n')
+        self.assertEqual(stderr, '')
+        self.assertIn('пользователей создано 0, обновлено 1', stdout)
+        self.assertIn('членств создано 0, обновлено 1', stdout)
+        ivanov.refresh_from_db()
+        self.assertEqual(ivanov.name, 'Иоанн')
+        self.assertTrue(ivanov.check_password('secret'))
+        self.assertEqual((School.objects.count(), User.objects.count()), (1, 2))
+        self.assertEqual(MembersInOrganization.objects.get(user=ivanov).role, 'leader')
+        self.organization.refresh_from_db()
+        self.assertEqual(self.organization.members_count, 1)
+
+    def test_bad_rows_are_reported(self):
+        stdout, stderr = self.import_file('users.jsonl', '\n'.join([
+            '{"email": "ivanov@dvfu.ru", "name": "Иван"}',
+            'не json',
+            '{"name": "Без почты"}',
+            '{"email": "a@dvfu.ru", "education_level": "school"}',
+            '{"email": "b@dvfu.ru", "faculty": "ИТ"}',
+            '{"email": "c@dvfu.ru", "organization": "клуб"}',
+            '{"email": "d@dvfu.ru", "organization": 1000000}',
+            f'{{"email": "e@dvfu.ru", "organization": {self.organization.pk}, "role": "owner"}}',
+        ]))
+        self.assertEqual(stderr.splitlines(), [
+            'строка 2: не удалось прочитать строку',
+            'строка 3: не указан email',
+            'строка 4: неизвестный уровень образования school',
+            'строка 5: факультет указан без школы',
+            'строка 6: id организации должен быть числом',
+            'строка 8: неизвестная роль owner',
+            'строка 7: организация 1000000 не найдена',
+        ])
+        self.assertIn('пользователей создано 1', stdout)
+        self.assertIn('ошибок 7', stdout)
+        self.assertEqual(list(User.objects.values_list('email', flat=True)), ['ivanov@dvfu.ru'])
+
+
+@override_settings(PASSWORD_HASHERS=['api.hashers.ScryptPasswordHasher',
+                                     'django.contrib.auth.hashers.PBKDF2PasswordHasher'])
+class ScryptPasswordHasherTests(TestCase):
+    """
+    Хеширование паролей алгоритмом scrypt
+    """
+    def test_round_trip(self):
+        encoded = make_password('lètmein')
+        self.assertTrue(encoded.startswith('scrypt$16384$'))
+        self.assertTrue(check_password('lètmein', encoded))
+        self.assertFalse(check_password('letmein', encoded))
+
+    def test_django_4_hash(self):
+        # Хеш ScryptPasswordHasher из Django 4.0 для пароля 'lètmein' и соли 'seasalt'
+        encoded = ('scrypt$16384$seasalt$8$1$Qj3+9PPyRjSJIebHnG81TMjsqtaIGxNQG/aEB/NYafTJ7tibgfYz71m0ldQESkXF'
+                   'RkdVCBhhY8mx7rQwite/Pw==')
+        self.assertEqual(make_password('lètmein', 'seasalt'), encoded)
+        self.assertTrue(check_password('lètmein', encoded))
+        self.assertFalse(identify_hasher(encoded).must_update(encoded))
+
+    def test_outdated_hashes_are_updated_on_login(self):
+        client = APIClient()
+        weak = ScryptPasswordHasher().encode('password', 'seasalt', n=2 ** 10)
+        pbkdf2 = make_password('password', hasher='pbkdf2_sha256')
+        self.assertTrue(ScryptPasswordHasher().must_update(weak))
+        for number, encoded in enumerate((weak, pbkdf2)):
+            user = User.objects.create_user(email=f'user{number}@dvfu.ru')
+            User.objects.filter(pk=user.pk).update(password=encoded)
+
+            response = client.post('/api/auth/jwt/create/', {'email': user.email, 'password': 'password'})
+            self.assertEqual(response.status_code, 200)
+            user.refresh_from_db()
+            self.assertTrue(user.password.startswith('scrypt$16384$'))
+            self.assertTrue(user.check_password('password'))
+
+
+class MigrationTests(TransactionTestCase):
+    """
+    Миграции данных на базе данных с существующими строками
+    """
+    def tearDown(self):
+        self.migrate('0008_event_guests_through')
+
+    def migrate(self, name):
+        """
+        Применение или откат миграций api до name, возвращает состояние моделей после нее
+        """
+        executor = MigrationExecutor(connection)
+        executor.migrate([('api', name)])
+        executor.loader.build_graph()
+        return executor.loader.project_state(('api', name)).apps
+
+    def create_event(self, apps, organization, name):
+        return apps.get_model('api', 'Event').objects.create(
+            name=name, organization=organization, time=datetime.time(10), auditorium='D734',
+            date=datetime.date(2026, 1, 1), date_end=datetime.date(2026, 1, 2))
+
+    def test_counters_are_recounted(self):
+        apps = self.migrate('0006_image_derivatives')
+        users = [apps.get_model('api', 'User').objects.create(email=f'user{number}@dvfu.ru', password='')
+                 for number in range(3)]
+        organization = apps.get_model('api', 'Organization').objects.create(name='Клуб')
+        event = self.create_event(apps, organization, 'Мероприятие')
+        empty_event = self.create_event(apps, organization, 'Пустое мероприятие')
+        for user in users:
+            apps.get_model('api', 'EventGuests').objects.create(user=user, event=event)
+            apps.get_model('api', 'MembersInOrganization').objects.create(user=user, organization=organization)
+        apps.get_model('api', 'EventOrganizers').objects.create(user=users[0], event=event, role='leader')
+
+        apps = self.migrate('0007_counters')
+        Event = apps.get_model('api', 'Event')
+        self.assertEqual(Event.objects.get(pk=event.pk).guests_count, 3)
+        self.assertEqual(Event.objects.get(pk=event.pk).organizers_count, 1)
+        self.assertEqual(Event.objects.get(pk=empty_event.pk).guests_count, 0)
+        self.assertEqual(apps.get_model('api', 'Organization').objects.get(pk=organization.pk).members_count, 3)
+
+    def test_legacy_guests_are_merged(self):
+        apps = self.migrate('0007_counters')
+        users = [apps.get_model('api', 'User').objects.create(email=f'user{number}@dvfu.ru', password='')
+                 for number in range(3)]
+        event = self.create_event(apps, apps.get_model('api', 'Organization').objects.create(name='Клуб'),
+                                  'Мероприятие')
+        apps.get_model('api', 'EventGuests').objects.create(user=users[0], event=event)
+        LegacyGuests = apps.get_model('api', 'Event')._meta.get_field('guests').remote_field.through
+        LegacyGuests.objects.bulk_create([LegacyGuests(user=user, event=event) for user in users[:2]])
+
+        apps = self.migrate('0008_event_guests_through')
+        guests = apps.get_model('api', 'EventGuests').objects.filter(event_id=event.pk)
+        self.assertCountEqual(guests.values_list('user_id', flat=True), [users[0].pk, users[1].pk])
+        self.assertEqual(apps.get_model('api', 'Event').objects.get(pk=event.pk).guests_count, 2)
+        self.assertNotIn('api_event_guests', connection.introspection.table_names())
+
+        apps = self.migrate('0007_counters')
+        LegacyGuests = apps.get_model('api', 'Event')._meta.get_field('guests').remote_field.through
+        self.assertCountEqual(LegacyGuests.objects.values_list('user_id', flat=True), [users[0].pk, users[1].pk])
@@ -0,0 +1,104 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.core.files.uploadhandler import FileUploadHandler
+from django.db import models
+from django.http.multipartparser import MultiPartParserError
+from django.urls import Resolver404, resolve
+from rest_framework.exceptions import ValidationError
+
+from api.validators import ImageValidator, ImageOpenValidator, EXTENSION_FORMATS, read_image_header, \
+    detect_image_format
+
+# Валидатор изображений полей без собственных валидаторов формата
+DEFAULT_IMAGE_VALIDATOR = ImageOpenValidator(extensions=list(EXTENSION_FORMATS))
+
+
+class ImageUploadRejected(MultiPartParserError):
+    """
+    Загрузка изображения отклонена до получения всего файла
+    """
+
+
+def upload_model(request):
+    """
+    Модель представления, которому отправлен запрос (по queryset класса представления)
+    """
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return None
+    queryset = getattr(getattr(match.func, 'cls', None), 'queryset', None)
+    return getattr(queryset, 'model', None)
+
+
+def image_field_rules(model, field_name):
+    """
+    Валидаторы заголовка и максимальный размер файла поля изображения модели
+
+    Возвращает None, если у модели нет поля изображения с таким именем.
+    Размер задается для поля в IMAGE_UPLOAD_LIMITS ('api.Slide.img': байты),
+    для остальных полей используется IMAGE_UPLOAD_MAX_BYTES
+    """
+    try:
+        field = model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        return None
+    if not isinstance(field, models.ImageField):
+        return None
+    validators = [validator for validator in field.validators if isinstance(validator, ImageValidator)]
+    limits = getattr(settings, 'IMAGE_UPLOAD_LIMITS', {})
+    max_bytes = limits.get(f'{model._meta.label}.{field_name}',
+                           getattr(settings, 'IMAGE_UPLOAD_MAX_BYTES', 10 * 1024 * 1024))
+    return validators or [DEFAULT_IMAGE_VALIDATOR], max_bytes
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """
+    Обработчик загрузки, проверяющий изображения по первому блоку данных
+
+    Проверяются только файлы, имя которых совпадает с полем ImageField модели представления,
+    которому отправлен запрос: размер (IMAGE_UPLOAD_LIMITS/IMAGE_UPLOAD_MAX_BYTES), сигнатура
+    и заголовок по валидаторам этого поля.
+
+    Принятые данные передаются следующим обработчикам (в память или во временный файл),
+    а не сразу в хранилище: файл отклоненного сериализатором запроса не должен оставаться
+    в хранилище. FileSystemStorage перемещает временный файл на место без копирования
+    """
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.model = upload_model(self.request)
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        model = getattr(self, 'model', None)
+        rules = image_field_rules(model, field_name) if model is not None else None
+        self.validators, self.max_bytes = rules or (None, None)
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.validators is None:
+            return raw_data
+        if start + len(raw_data) > self.max_bytes:
+            raise ImageUploadRejected(f'{self.field_name}: file is larger than {self.max_bytes} bytes')
+        if start == 0:
+            self.check_header(raw_data)
+        return raw_data
+
+    def check_header(self, raw_data):
+        """
+        Проверка заголовка изображения по первому блоку данных
+        """
+        header = read_image_header(BytesIO(raw_data))
+        if header is None:
+            if detect_image_format(raw_data) is None:
+                raise ImageUploadRejected(f'{self.field_name}: {ImageOpenValidator.error_msg}')
+            # Размеры JPEG находятся дальше первого блока, проверку выполнит валидатор поля
+            return
+        try:
+            for validator in self.validators:
+                validator.validate(header)
+        except ValidationError as exc:
+            raise ImageUploadRejected(f'{self.field_name}: {" ".join(map(str, exc.detail))}')
+
+    def file_complete(self, file_size):
+        return None
@@ -2,7 +2,7 @@ from django.conf.urls import url
 from django.urls import path, include
 from rest_framework import routers
 
-from .views.auth_view import UserActivationView, PasswordResetConfirmView
+from .views.auth_view import UserActivationView, PasswordResetConfirmView, TokenCreateView
 from .views.event_guests_view import EventGuestsViewSet
 from .views.event_organizers_view import EventOrganizersViewSet
 from .views.event_view import EventViewSet
@@ -10,6 +10,8 @@ from .views.member_in_organization_view import MembersInOrganizationForUserViewS
     MembersInOrganizationForOrganizationViewSet
 from .views.notification_view import NotificationViewSet
 from .views.organization_view import OrganizationViewSet
+from .views.search_view import SearchView
+from .views.stats_view import RoleCacheStatsView
 from .views.other_views import EventCategoryViewSet, EventTypeViewSet, SlideViewSet, SchoolViewSet, FacultyViewSet
 
 router = routers.DefaultRouter()
@@ -29,8 +31,14 @@ router.register(r'faculties', FacultyViewSet)
 urlpatterns = [
     # DRF router
     path('', include(router.urls)),
+    # Поиск мероприятий и организаций
+    path('search/', SearchView.as_view()),
+    # Счетчики кеша ролей (для администраторов)
+    path('stats/role-cache/', RoleCacheStatsView.as_view()),
     # djoser auth urls
     url(r'^auth/', include('djoser.urls')),
+    # Получение JWT с полями пользователя (до djoser.urls.jwt, чтобы заменить jwt/create)
+    url(r'^auth/jwt/create/?', TokenCreateView.as_view(), name='jwt-create'),
     # djoser auth jwt urls
     url(r'^auth/', include('djoser.urls.jwt')),
     # Активация профиля пользователя
@@ -1,9 +1,7 @@
-import base64
 import json
-from io import BytesIO
-from pathlib import PurePosixPath
+import struct
+from collections import namedtuple
 
-from PIL import UnidentifiedImageError, Image
 from django.core.validators import RegexValidator
 from django.utils.deconstruct import deconstructible
 from rest_framework.exceptions import ValidationError
@@ -13,16 +11,142 @@ phone_regex = RegexValidator(
     message="Phone number is invalid. Try: '+(country code)(number)'. example: +79123456789."
 )
 
+ImageHeader = namedtuple('ImageHeader', ('format', 'width', 'height'))
+
+# Extension -> real image format detected by magic bytes
+EXTENSION_FORMATS = {
+    'bmp': 'bmp',
+    'gif': 'gif',
+    'jpeg': 'jpeg',
+    'jpg': 'jpeg',
+    'png': 'png',
+    'webp': 'webp',
+}
+
+# JPEG markers that carry frame dimensions (SOF0-SOF15 except DHT, JPG and DAC)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# JPEG markers without a length field
+JPEG_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD9)}
+
+
+def _read_jpeg_size(file):
+    """
+    Walks JPEG segments from the start of the file, skipping segment bodies, until a SOF marker
+    """
+    file.seek(2)
+    while True:
+        byte = file.read(1)
+        while byte and byte != b'\xff':
+            byte = file.read(1)
+        while byte == b'\xff':
+            byte = file.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker == 0xD9:
+            return None
+        length_bytes = file.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if marker in JPEG_SOF_MARKERS:
+            frame = file.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack('>xHH', frame)
+            return width, height
+        file.seek(length - 2, 1)
+
+
+def detect_image_format(head):
+    """
+    Detects the image format by the magic bytes at the start of the file
+    """
+    if head[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if head[:2] == b'BM':
+        return 'bmp'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    if head[:2] == b'\xff\xd8':
+        return 'jpeg'
+    return None
+
+
+def _parse_header(head, file):
+    """
+    Reads image dimensions from the header of a detected image format
+    """
+    image_format = detect_image_format(head)
+    if image_format == 'png' and head[12:16] == b'IHDR':
+        width, height = struct.unpack('>II', head[16:24])
+        return ImageHeader('png', width, height)
+    if image_format == 'gif':
+        width, height = struct.unpack('<HH', head[6:10])
+        return ImageHeader('gif', width, height)
+    if image_format == 'bmp':
+        dib_size = struct.unpack('<I', head[14:18])[0]
+        if dib_size == 12:
+            width, height = struct.unpack('<HH', head[18:22])
+        else:
+            width, height = struct.unpack('<ii', head[18:26])
+        return ImageHeader('bmp', width, abs(height))
+    if image_format == 'webp':
+        chunk = head[12:16]
+        if chunk == b'VP8 ':
+            width, height = struct.unpack('<HH', head[26:30])
+            return ImageHeader('webp', width & 0x3FFF, height & 0x3FFF)
+        if chunk == b'VP8L':
+            bits = int.from_bytes(head[21:25], 'little')
+            return ImageHeader('webp', (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+        if chunk == b'VP8X':
+            width = int.from_bytes(head[24:27], 'little') + 1
+            height = int.from_bytes(head[27:30], 'little') + 1
+            return ImageHeader('webp', width, height)
+        return None
+    if image_format == 'jpeg':
+        size = _read_jpeg_size(file)
+        if size is None:
+            return None
+        return ImageHeader('jpeg', *size)
+    return None
+
+
+def read_image_header(file):
+    """
+    Reads image format and dimensions from the file header without decoding pixel data
+
+    Returns ImageHeader or None if the file is not a supported image.
+    The file position is restored afterwards
+    """
+    position = file.tell()
+    try:
+        file.seek(0)
+        head = file.read(32)
+        if len(head) < 32:
+            return None
+        return _parse_header(head, file)
+    except (struct.error, OSError, ValueError):
+        return None
+    finally:
+        file.seek(position)
+
 
 @deconstructible
 class ImageValidator:
     """
     Base Image Validation class
-    Validates image format
+    Validates image format, detected by the file magic bytes
     :param extensions: Tuple or List of file extensions, that should pass the validation
-    Raises rest_framework.exceptions.ValidationError: in case file extension are not in the list
+    Raises rest_framework.exceptions.ValidationError: in case image format is not in the list
+
+    Validators keep no state, so one instance can be shared between threads
     """
-    warning_msg = 'Warning! Pillow is not installed, validation has not been done'
     default_extensions = [
         'bmp',
         'jpeg',
@@ -42,30 +166,32 @@ class ImageValidator:
     def __call__(self, value):
         if isinstance(value, (str, bytes)):
             value = json.loads(value)
-        file_extension = PurePosixPath(value.name).suffix
-        if value and file_extension[1:] not in self.extensions:
+        if not value:
+            return
+        self.validate(read_image_header(value))
+
+    def validate(self, header):
+        formats = {EXTENSION_FORMATS.get(extension, extension) for extension in self.extensions}
+        image_format = header.format if header is not None else 'unknown'
+        if image_format not in formats:
             raise ValidationError(f'unsupported image file format,'
                                   f' expected ({",".join(self.extensions)}),'
-                                  f' got {file_extension[1:]}')
+                                  f' got {image_format}')
 
 
 @deconstructible
 class ImageOpenValidator(ImageValidator):
     """
-    Image validator that checks if image can be unpacked from b64 to PIL Image obj
+    Image validator that checks if image header can be read
 
-    Raises rest_framework.exceptions.ValidationError: in case PIL throws error when trying to open given file
+    Raises rest_framework.exceptions.ValidationError: in case the header is not a valid image header
     """
     error_msg = 'for some reason, this image file cannot be opened'
 
-    def __call__(self, value):
-        if isinstance(value, (str, bytes)):
-            value = json.loads(value)
-        super().__call__(value)
-        try:
-            self.img = Image.open(value)
-        except UnidentifiedImageError:
+    def validate(self, header):
+        if header is None:
             raise ValidationError(self.error_msg)
+        super().validate(header)
 
 
 @deconstructible
@@ -78,17 +204,12 @@ class ImageBaseSizeValidator(ImageOpenValidator):
     """
     orientation = ()
 
-    def __call__(self, value):
-        if isinstance(value, (str, bytes)):
-            value = json.loads(value)
-        super().__call__(value)
-        self.validate()
-
-    def validate(self):
+    def validate(self, header):
+        super().validate(header)
         for orientation in self.orientation:
             min_value = getattr(self, f'min_{orientation}', 1)
             max_value = getattr(self, f'max_{orientation}', float('inf'))
-            value = getattr(self.img, orientation)
+            value = getattr(header, orientation)
             if not (min_value <= value <= max_value):
                 raise ValidationError(f'Invalid image {orientation}. Expected from {min_value}'
                                       f' to {max_value}, got {value}')
@@ -1,25 +1,72 @@
-import requests
+from functools import partial
+
+from django.contrib.auth.tokens import default_token_generator
+from django.contrib.sites.shortcuts import get_current_site
+from django.db import transaction
 from django.shortcuts import redirect
+from djoser import signals
+from djoser.compat import get_user_email
+from djoser.conf import settings as djoser_settings
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import AllowAny
 from rest_framework.views import APIView
+from rest_framework_simplejwt.views import TokenObtainPairView
+
+from api.mail import OutboxEmailBackend
+from api.serializers.token_serializer import TokenObtainPairWithClaimsSerializer
 from config import settings
 
 
+def email_context(request):
+    """
+    Адрес сайта для писем из запроса
+    """
+    site = get_current_site(request)
+    return {
+        'domain': getattr(settings, 'DOMAIN', '') or site.domain,
+        'protocol': 'https' if request.is_secure() else 'http',
+        'site_name': getattr(settings, 'SITE_NAME', '') or site.name,
+    }
+
+
+def queue_confirmation_email(context, user):
+    """
+    Постановка письма о подтверждении активации профиля в очередь OutgoingEmail
+
+    Письмо сохраняется в базе данных и отправляется командой send_outbox, поэтому
+    не теряется при перезапуске процесса
+    """
+    message = djoser_settings.EMAIL.confirmation(context=dict(context, user=user), connection=OutboxEmailBackend())
+    message.send([get_user_email(user)])
+
+
 class UserActivationView(APIView):
     """
     Представление активации профиля
     """
     permission_classes = (AllowAny,)
+    token_generator = default_token_generator
 
     def get(self, request, uid, token):
         """
         Активация профиля и перенаправление на вход в профиль
         """
-        protocol = 'https://' if request.is_secure() else 'http://'
-        web_url = protocol + request.get_host()
-        post_url = web_url + "/SOLO/auth/users/activation/"
-        post_data = {'uid': uid, 'token': token}
-        requests.post(post_url, data=post_data)
+        serializer = djoser_settings.SERIALIZERS.activation(
+            data={'uid': uid, 'token': token},
+            context={'request': request, 'view': self})
+        try:
+            is_valid = serializer.is_valid()
+        except PermissionDenied:
+            # Профиль уже активирован
+            is_valid = False
+
+        if is_valid:
+            user = serializer.user
+            user.is_active = True
+            user.save(update_fields=['is_active'])
+            signals.user_activated.send(sender=self.__class__, user=user, request=request)
+            if djoser_settings.SEND_CONFIRMATION_EMAIL:
+                transaction.on_commit(partial(queue_confirmation_email, email_context(request), user))
         return redirect('http://' + settings.FRONT_HOST)
 
 
@@ -34,3 +81,10 @@ class PasswordResetConfirmView(APIView):
         Получение токена и UID и перенаправление на смену пароля
         """
         return redirect('http://' + settings.FRONT_HOST + '?uid=' + uid + 'token=' + token)
+
+
+class TokenCreateView(TokenObtainPairView):
+    """
+    Получение пары JWT с полями пользователя (Представление)
+    """
+    serializer_class = TokenObtainPairWithClaimsSerializer
@@ -1,8 +1,12 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
+from rest_framework.response import Response
 
+from api.bulk import validate_rows, bulk_create_rows, bulk_delete_rows
 from api.models import EventGuests
 from api.permissons import IsOwnerOrAdmin
+from ..serializers.bulk_serializer import BulkRowsSerializer, EventGuestsBulkRowSerializer
 from ..serializers.event_guests_serializer import EventGuestsAdminSerializer, EventGuestsSerializer
 
 
@@ -30,7 +34,7 @@ class EventGuestsViewSet(viewsets.ModelViewSet):
         """
         if self.action in ['destroy']:
             permission_classes = (IsOwnerOrAdmin,)
-        elif self.action in ['created']:
+        elif self.action in ['created', 'bulk', 'bulk_delete']:
             permission_classes = (IsAuthenticated,)
         elif self.action in ['update', 'partial_update']:
             permission_classes = (IsAdminUser,)
@@ -43,9 +47,36 @@ class EventGuestsViewSet(viewsets.ModelViewSet):
         """
         Класс сериализатора
         """
-        if self.request.user.is_staff:
+        if self.action in ['bulk', 'bulk_delete']:
+            serializer_class = BulkRowsSerializer
+        elif self.request.user.is_staff:
             serializer_class = EventGuestsAdminSerializer
         else:
             serializer_class = EventGuestsSerializer
 
-        return serializer_class
\ No newline at end of file
+        return serializer_class
+
+    def _bulk_rows(self, request):
+        """
+        Проверка строк массовой операции
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return validate_rows(EventGuestsBulkRowSerializer, serializer.validated_data['rows'])
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Массовая регистрация гостей (руководители мероприятия могут добавлять любых пользователей,
+        остальные - только себя), отчет по каждой строке
+        """
+        return Response({'results': bulk_create_rows(request, EventGuests, self._bulk_rows(request),
+                                                     allow_self=True)})
+
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_delete(self, request):
+        """
+        Массовое удаление гостей, отчет по каждой строке
+        """
+        return Response({'results': bulk_delete_rows(request, EventGuests, self._bulk_rows(request),
+                                                     allow_self=True)})
\ No newline at end of file
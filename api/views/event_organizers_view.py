@@ -1,8 +1,12 @@
 from rest_framework import viewsets
-from rest_framework.permissions import AllowAny
+from rest_framework.decorators import action
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
 
+from api.bulk import validate_rows, bulk_create_rows, bulk_delete_rows
 from api.models import EventOrganizers
 from api.permissons import IsLeaderOrAdmin
+from ..serializers.bulk_serializer import BulkRowsSerializer, EventOrganizersBulkRowSerializer
 from ..serializers.event_organizers_serializer import EventOrganizersAdminSerializer, EventOrganizersSerializer
 
 
@@ -18,6 +22,8 @@ class EventOrganizersViewSet(viewsets.ModelViewSet):
         """
         if self.action in ['update', 'partial_update', 'destroy', 'create']:
             permission_classes = (IsLeaderOrAdmin,)
+        elif self.action in ['bulk', 'bulk_delete']:
+            permission_classes = (IsAuthenticated,)
         else:
             permission_classes = (AllowAny,)
 
@@ -27,9 +33,33 @@ class EventOrganizersViewSet(viewsets.ModelViewSet):
         """
         Класс сериализатора
         """
-        if self.request.user.is_staff:
+        if self.action in ['bulk', 'bulk_delete']:
+            serializer_class = BulkRowsSerializer
+        elif self.request.user.is_staff:
             serializer_class = EventOrganizersAdminSerializer
         else:
             serializer_class = EventOrganizersSerializer
 
         return serializer_class
+
+    def _bulk_rows(self, request):
+        """
+        Проверка строк массовой операции
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return validate_rows(EventOrganizersBulkRowSerializer, serializer.validated_data['rows'])
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Массовое назначение организаторов руководителем мероприятия, отчет по каждой строке
+        """
+        return Response({'results': bulk_create_rows(request, EventOrganizers, self._bulk_rows(request))})
+
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_delete(self, request):
+        """
+        Массовое удаление организаторов руководителем мероприятия, отчет по каждой строке
+        """
+        return Response({'results': bulk_delete_rows(request, EventOrganizers, self._bulk_rows(request))})
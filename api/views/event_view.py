@@ -1,16 +1,24 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
 from rest_framework.permissions import AllowAny, IsAdminUser
 
+from api.exports import export_event_guests
+from api.filters import EventFilterBackend
 from api.models import Event
 from api.permissons import IsLeaderOrAdmin, IsOrganizationMemberOrAdmin
-from ..serializers.event_serializer import EventAdminSerializer, EventSerializer
+from .mixins import OptimizedQuerySetMixin, ConditionalObjectMixin
+from ..serializers.event_serializer import EventAdminSerializer, EventSerializer, EventListSerializer
 
 
-class EventViewSet(viewsets.ModelViewSet):
+class EventViewSet(ConditionalObjectMixin, OptimizedQuerySetMixin, viewsets.ModelViewSet):
     """
     События (Пердставление)
     """
     queryset = Event.objects.all()
+    filter_backends = (EventFilterBackend, OrderingFilter)
+    ordering_fields = ('date', 'date_end', 'created_at', 'name')
+    ordering = ('-created_at', '-id')
 
     def get_permissions(self):
         """
@@ -20,7 +28,7 @@ class EventViewSet(viewsets.ModelViewSet):
             permission_classes = (IsOrganizationMemberOrAdmin,)
         elif self.action in ['destroy']:
             permission_classes = (IsAdminUser,)
-        elif self.action in ['update', 'partial_update']:
+        elif self.action in ['update', 'partial_update', 'guests_export']:
             permission_classes = (IsLeaderOrAdmin,)
         else:
             permission_classes = (AllowAny,)
@@ -31,9 +39,19 @@ class EventViewSet(viewsets.ModelViewSet):
         """
         Класс сериализатора
         """
-        if self.request.user.is_staff:
+        if self.action in ['list']:
+            serializer_class = EventListSerializer
+        elif self.request.user.is_staff:
             serializer_class = EventAdminSerializer
         else:
             serializer_class = EventSerializer
 
         return serializer_class
+
+    @action(detail=True, methods=['get'], url_path='guests-export')
+    def guests_export(self, request, pk=None):
+        """
+        Потоковая выгрузка гостей мероприятия в CSV
+        """
+        event = self.get_object()
+        return export_event_guests(event.id)
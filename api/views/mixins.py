@@ -0,0 +1,175 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag, http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from api.caching import get_table_version, shared_timeout
+from api.querysets import optimize_queryset
+
+
+class OptimizedQuerySetMixin:
+    """
+    Набор данных с select_related/prefetch_related по полям сериализатора (Примесь)
+    """
+    optimized_actions = ('list', 'retrieve')
+
+    def get_queryset(self):
+        """
+        Получение набора данных
+        """
+        queryset = super().get_queryset()
+        if self.action in self.optimized_actions:
+            queryset = optimize_queryset(queryset, self.get_serializer())
+        return queryset
+
+
+class TableVersionCacheMixin:
+    """
+    ETag по версии таблицы и кеш отрисованных ответов для справочников (Примесь)
+
+    Версия таблицы увеличивается сигналами при сохранении и удалении объектов,
+    поэтому при совпадении If-None-Match ответ 304 отдается без обращения к базе данных
+    """
+    cached_formats = ('json',)
+    _etag = None
+    _response_cache_key = None
+
+    def get_etag(self):
+        """
+        ETag текущей версии таблицы
+        """
+        model = self.queryset.model
+        return quote_etag(f'{model._meta.db_table}-{get_table_version(model)}')
+
+    def _response_key(self, request, etag):
+        url = hashlib.md5(f'{request.get_host()}{request.get_full_path()}'.encode()).hexdigest()
+        return f'response:{etag.strip(chr(34))}:{request.accepted_media_type}:{url}'
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        if request.accepted_renderer.format not in self.cached_formats:
+            return handler(request, *args, **kwargs)
+        self._etag = self.get_etag()
+        if self._etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            return HttpResponseNotModified()
+        key = self._response_key(request, self._etag)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return HttpResponse(content, content_type=content_type)
+        self._response_cache_key = key
+        return handler(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(super().retrieve, request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """
+        Сохранение отрисованного ответа в кеш и заголовки кеширования
+        """
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self._etag is None or response.status_code not in (200, 304):
+            return response
+        max_age = getattr(settings, 'REFERENCE_CACHE_MAX_AGE', 60)
+        if self._response_cache_key and response.status_code == 200:
+            response.render()
+            cache.set(self._response_cache_key, (response.content, response['Content-Type']),
+                      shared_timeout(getattr(settings, 'REFERENCE_CACHE_TIMEOUT', 60 * 60 * 24),
+                                     local_timeout=max_age))
+        response['ETag'] = self._etag
+        patch_cache_control(response, public=True, max_age=max_age)
+        patch_vary_headers(response, ('Accept',))
+        return response
+
+
+class PreconditionFailed(APIException):
+    """
+    Объект изменился после получения клиентом (Исключение)
+    """
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'Объект был изменен, загрузите его заново.'
+    default_code = 'precondition_failed'
+
+
+class ConditionalObjectMixin:
+    """
+    ETag и Last-Modified объекта по updated_at (Примесь)
+
+    retrieve отвечает 304 по If-None-Match/If-Modified-Since без сериализации объекта,
+    update/partial_update с If-Match отклоняются с 412, если объект уже изменен
+    """
+    _conditional_object = None
+
+    def get_object_etag(self, pk, updated_at):
+        """
+        ETag версии объекта
+        """
+        model = self.queryset.model
+        return quote_etag(hashlib.md5(f'{model._meta.db_table}:{pk}:{updated_at.isoformat()}'.encode()).hexdigest())
+
+    def _set_object_headers(self, response, pk, updated_at):
+        response['ETag'] = self.get_object_etag(pk, updated_at)
+        response['Last-Modified'] = http_date(updated_at.timestamp())
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    def _is_not_modified(self, request, etag, updated_at):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            return '*' in etags or etag in etags
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return if_modified_since is not None and int(updated_at.timestamp()) <= if_modified_since
+
+    def get_queryset(self):
+        """
+        Получение набора данных (с блокировкой строки при обновлении с If-Match)
+        """
+        queryset = super().get_queryset()
+        if self.action in ('update', 'partial_update') and 'HTTP_IF_MATCH' in self.request.META:
+            queryset = queryset.select_for_update()
+        return queryset
+
+    def get_object(self):
+        """
+        Получение объекта с проверкой If-Match
+        """
+        obj = super().get_object()
+        self._conditional_object = obj
+        if_match = self.request.META.get('HTTP_IF_MATCH')
+        if self.action in ('update', 'partial_update') and if_match:
+            etags = parse_etags(if_match)
+            if '*' not in etags and self.get_object_etag(obj.pk, obj.updated_at) not in etags:
+                raise PreconditionFailed()
+        return obj
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        updated_at = (self.queryset.model._default_manager
+                      .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+                      .values_list('pk', 'updated_at')
+                      .first())
+        if updated_at is not None:
+            pk, updated_at = updated_at
+            if self._is_not_modified(request, self.get_object_etag(pk, updated_at), updated_at):
+                return self._set_object_headers(HttpResponseNotModified(), pk, updated_at)
+
+        response = super().retrieve(request, *args, **kwargs)
+        obj = self._conditional_object
+        return self._set_object_headers(response, obj.pk, obj.updated_at)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            response = super().update(request, *args, **kwargs)
+        obj = self._conditional_object
+        # Сигналы связей (категории, типы) обновляют updated_at в базе данных после сохранения объекта
+        obj.refresh_from_db(fields=['updated_at'])
+        return self._set_object_headers(response, obj.pk, obj.updated_at)
@@ -1,9 +1,14 @@
-from rest_framework import viewsets
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
 
 from api.models import Notification
+from api.notifications import notify_event, notify_organization, get_unread_count, \
+    mark_notifications_viewed
 from api.permissons import IsOwnerOrAdmin
-from ..serializers.notification_serializer import NotificationAdminSerializer
+from ..serializers.notification_serializer import NotificationAdminSerializer, NotificationFanOutSerializer, \
+    NotificationIdsSerializer
 
 
 class NotificationViewSet(viewsets.ModelViewSet):
@@ -26,11 +31,46 @@ class NotificationViewSet(viewsets.ModelViewSet):
         """
         Права доступа
         """
-        if self.action in ['create']:
+        if self.action in ['create', 'fan_out']:
             permission_classes = (IsAdminUser,)
         else:
             permission_classes = (IsOwnerOrAdmin,)
 
         return [permission() for permission in permission_classes]
 
+    @action(detail=False, methods=['post'], url_path='fan-out', serializer_class=NotificationFanOutSerializer)
+    def fan_out(self, request):
+        """
+        Рассылка уведомления всем участникам мероприятия или членам организации
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        if 'event' in data:
+            created = notify_event(data['event'].id, data['message'], data['link'])
+        else:
+            created = notify_organization(data['organization'].id, data['message'], data['link'])
+        return Response({'created': created}, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], url_path='unread-count')
+    def unread_count(self, request):
+        """
+        Количество непрочитанных уведомлений текущего пользователя
+        """
+        return Response({'count': get_unread_count(request.user.id)})
 
+    @action(detail=False, methods=['post'], url_path='mark-all-viewed')
+    def mark_all_viewed(self, request):
+        """
+        Отметка всех уведомлений текущего пользователя прочитанными
+        """
+        return Response({'updated': mark_notifications_viewed(request.user.id)})
+
+    @action(detail=False, methods=['post'], url_path='mark-viewed', serializer_class=NotificationIdsSerializer)
+    def mark_viewed(self, request):
+        """
+        Отметка выбранных уведомлений текущего пользователя прочитанными
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({'updated': mark_notifications_viewed(request.user.id, serializer.validated_data['ids'])})
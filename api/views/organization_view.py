@@ -1,12 +1,16 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 
+from api.exports import export_organization_members
 from api.models import Organization
 from api.permissons import IsLeaderOrAdmin
-from ..serializers.organization_serializer import OrganizationAdminSerializer, OrganizationSerializer
+from .mixins import OptimizedQuerySetMixin, ConditionalObjectMixin
+from ..serializers.organization_serializer import OrganizationAdminSerializer, OrganizationSerializer, \
+    OrganizationListSerializer
 
 
-class OrganizationViewSet(viewsets.ModelViewSet):
+class OrganizationViewSet(ConditionalObjectMixin, OptimizedQuerySetMixin, viewsets.ModelViewSet):
     """
     Оргпнизации (Пердставление)
     """
@@ -20,7 +24,7 @@ class OrganizationViewSet(viewsets.ModelViewSet):
             permission_classes = (IsAuthenticated,)
         elif self.action in ['destroy']:
             permission_classes = (IsAdminUser,)
-        elif self.action in ['update', 'partial_update']:
+        elif self.action in ['update', 'partial_update', 'members_export']:
             permission_classes = (IsLeaderOrAdmin,)
         else:
             permission_classes = (AllowAny,)
@@ -31,9 +35,19 @@ class OrganizationViewSet(viewsets.ModelViewSet):
         """
         Класс сериализатора
         """
-        if self.request.user.is_staff:
+        if self.action in ['list']:
+            serializer_class = OrganizationListSerializer
+        elif self.request.user.is_staff:
             serializer_class = OrganizationAdminSerializer
         else:
             serializer_class = OrganizationSerializer
 
         return serializer_class
+
+    @action(detail=True, methods=['get'], url_path='members-export')
+    def members_export(self, request, pk=None):
+        """
+        Потоковая выгрузка членов организации в CSV
+        """
+        organization = self.get_object()
+        return export_organization_members(organization.id)
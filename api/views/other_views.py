@@ -2,11 +2,12 @@ from rest_framework import viewsets
 from rest_framework.permissions import AllowAny, IsAdminUser
 
 from api.models import EventType, EventCategory, Slide, School, Faculty
+from .mixins import TableVersionCacheMixin
 from ..serializers.other_serializers import EventTypeSerializer, EventCategorySerializer, SlideSerializer, \
     SchoolSerializer, FacultySerializer
 
 
-class EventTypeViewSet(viewsets.ModelViewSet):
+class EventTypeViewSet(TableVersionCacheMixin, viewsets.ModelViewSet):
     """
     Тип мероприятия (Пердставление)
     """
@@ -25,7 +26,7 @@ class EventTypeViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
 
-class EventCategoryViewSet(viewsets.ModelViewSet):
+class EventCategoryViewSet(TableVersionCacheMixin, viewsets.ModelViewSet):
     """
     Категория мероприятия (Пердставление)
     """
@@ -44,7 +45,7 @@ class EventCategoryViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
 
-class SlideViewSet(viewsets.ModelViewSet):
+class SlideViewSet(TableVersionCacheMixin, viewsets.ModelViewSet):
     """
     Слайд (Пердставление)
     """
@@ -63,7 +64,7 @@ class SlideViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
 
-class SchoolViewSet(viewsets.ModelViewSet):
+class SchoolViewSet(TableVersionCacheMixin, viewsets.ModelViewSet):
     """
     Школа (Пердставление)
     """
@@ -82,7 +83,7 @@ class SchoolViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
 
 
-class FacultyViewSet(viewsets.ModelViewSet):
+class FacultyViewSet(TableVersionCacheMixin, viewsets.ModelViewSet):
     """
     Факультет (Пердставление)
     """
@@ -0,0 +1,40 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.models import Event, Organization
+from api.querysets import optimize_queryset
+from api.search import search
+from ..serializers.event_serializer import EventListSerializer
+from ..serializers.organization_serializer import OrganizationListSerializer
+
+
+class SearchView(APIView):
+    """
+    Поиск мероприятий и организаций (Представление)
+    """
+    permission_classes = (AllowAny,)
+    default_limit = 20
+    max_limit = 100
+
+    def get(self, request):
+        """
+        Поиск по параметру q, количество результатов задается параметром limit
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            raise ValidationError({'q': 'Пустой поисковый запрос'})
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', self.default_limit)), self.max_limit))
+        except ValueError:
+            raise ValidationError({'limit': 'Ожидается целое число'})
+
+        context = {'request': request, 'view': self}
+        results = {}
+        for key, model, serializer_class in (('events', Event, EventListSerializer),
+                                             ('organizations', Organization, OrganizationListSerializer)):
+            serializer = serializer_class(many=True, context=context)
+            queryset = optimize_queryset(search(model.objects.all(), query), serializer.child)
+            results[key] = serializer_class(queryset[:limit], many=True, context=context).data
+        return Response(results)
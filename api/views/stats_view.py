@@ -0,0 +1,20 @@
+import os
+
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from api.roles import role_cache_stats
+
+
+class RoleCacheStatsView(APIView):
+    """
+    Попадания и промахи кеша ролей процесса, обработавшего запрос (Представление)
+    """
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        """
+        Счетчики кеша ролей и pid процесса
+        """
+        return Response(dict(role_cache_stats(), pid=os.getpid()))
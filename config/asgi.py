@@ -13,4 +13,16 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from api.realtime import notification_stream  # noqa: E402
+
+# Поток уведомлений (Server-Sent Events) обслуживается в обход Django
+NOTIFICATION_STREAM_PATH = '/api/notification/stream/'
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http' and scope['path'] == NOTIFICATION_STREAM_PATH:
+        await notification_stream(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
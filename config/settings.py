@@ -94,6 +94,35 @@ DATABASES = {
     }
 }
 
+# Настройка кеша (по умолчанию в памяти процесса, бэкенд можно заменить, например на Redis)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Время жизни значений, которые сбрасываются из других процессов (роли, версии справочников, счетчики),
+# если кеш хранится в памяти процесса: сброс в одном процессе gunicorn не виден другим,
+# поэтому для нескольких процессов нужен общий кеш (например, Redis)
+LOCAL_CACHE_TIMEOUT = int(os.getenv('LOCAL_CACHE_TIMEOUT', 5))
+
+# Время жизни кеша ролей пользователей в секундах (для кеша в памяти процесса не больше LOCAL_CACHE_TIMEOUT)
+ROLE_CACHE_TIMEOUT = int(os.getenv('ROLE_CACHE_TIMEOUT', 60 * 60 * 24))
+
+# Время хранения отрисованных ответов справочников в кеше, в секундах
+# (для кеша в памяти процесса ответы и версии таблиц хранятся не дольше REFERENCE_CACHE_MAX_AGE)
+REFERENCE_CACHE_TIMEOUT = int(os.getenv('REFERENCE_CACHE_TIMEOUT', 60 * 60 * 24))
+
+# max-age заголовка Cache-Control справочников, в секундах
+REFERENCE_CACHE_MAX_AGE = int(os.getenv('REFERENCE_CACHE_MAX_AGE', 60))
+
+# Максимальное количество строк в одном запросе массовой регистрации гостей и организаторов
+BULK_MAX_ROWS = int(os.getenv('BULK_MAX_ROWS', 5000))
+
+# Количество процессов хеширования паролей при массовом создании пользователей (по умолчанию по числу ядер)
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 0)) or None
+
 # Настройки языка и времени
 LANGUAGE_CODE = 'en-us'
 
@@ -111,6 +140,34 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static/')
 
 AUTH_USER_MODEL = 'api.User'
 
+# Алгоритмы хеширования паролей: pbkdf2, scrypt или argon2 (пакет argon2-cffi из requirements.txt)
+PASSWORD_HASHER_CHOICES = {
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'api.hashers.ScryptPasswordHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+}
+
+# Основной алгоритм идет первым, остальные проверяют старые хеши, которые пересчитываются при входе
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    hasher for name, hasher in PASSWORD_HASHER_CHOICES.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+# Обработчики загрузки файлов: изображения полей ImageField модели представления проверяются по первому блоку данных
+FILE_UPLOAD_HANDLERS = [
+    'api.uploads.ImageUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+
+# Максимальный размер загружаемого изображения в байтах
+IMAGE_UPLOAD_MAX_BYTES = int(os.getenv('IMAGE_UPLOAD_MAX_BYTES', 10 * 1024 * 1024))
+# Максимальные размеры изображений отдельных полей, например {'api.User.image': 2 * 1024 * 1024}
+IMAGE_UPLOAD_LIMITS = {}
+
 # Настройки CORS заголовков
 CORS_ORIGIN_ALLOW_ALL = True
 CORS_ALLOW_CREDENTIALS = True
@@ -123,9 +180,12 @@ REST_FRAMEWORK = {
     ],
     # Тип токенов и авторизации
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.TokenClaimsAuthentication",
         "rest_framework.authentication.SessionAuthentication"
-    ]
+    ],
+    # Курсорная пагинация списков (?unpaginated=true отключает пагинацию)
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 50,
 }
 
 # Настройки djoser
@@ -158,6 +218,12 @@ DJOSER = {
     }
 }
 
+# Время хранения версии полей пользователя из JWT в кеше, в секундах
+# (для кеша в памяти процесса не больше LOCAL_CACHE_TIMEOUT: иначе снятие прав
+# в одном процессе gunicorn не было бы видно в остальных). Сохранение пользователя и
+# User.objects...update() сбрасывают версии сразу, изменения SQL в обход ORM - только через это время
+AUTH_VERSION_CACHE_TIMEOUT = int(os.getenv('AUTH_VERSION_CACHE_TIMEOUT', 60 * 60 * 24))
+
 # Настройки JWT
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=2),
@@ -188,10 +254,23 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=5),
 }
 
-# Настройки почты
+# Настройки почты (письма сохраняются в очередь и отправляются командой send_outbox,
+# процесс worker из Procfile: python manage.py send_outbox --loop)
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'api.mail.OutboxEmailBackend')
+OUTBOX_DELIVERY_BACKEND = os.getenv('OUTBOX_DELIVERY_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 5))
+OUTBOX_RETRY_DELAY = int(os.getenv('OUTBOX_RETRY_DELAY', 60))
+# Время, на которое обработчик захватывает письма для отправки, в секундах
+OUTBOX_LEASE = int(os.getenv('OUTBOX_LEASE', 300))
 EMAIL_HOST = os.environ.get('EMAIL_HOST')
 EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER')
 EMAIL_USE_TLS = True
 DEFAULT_FROM_EMAIL = os.environ.get('EMAIL_HOST_USER')
 EMAIL_PORT = os.environ.get('EMAIL_PORT')
-EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
\ No newline at end of file
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD')
+
+# Брокер событий уведомлений для потока /api/notification/stream/
+NOTIFICATION_BROKER = os.getenv('NOTIFICATION_BROKER', 'api.realtime.InProcessBroker')
+
+# Интервал keep-alive потока уведомлений в секундах
+NOTIFICATION_STREAM_KEEPALIVE = int(os.getenv('NOTIFICATION_STREAM_KEEPALIVE', 15))